@@ -1,10 +1,15 @@
 from osrparse.utils import (GameMode, Mod, Key, ReplayEvent, ReplayEventOsu,
     ReplayEventTaiko, ReplayEventMania, ReplayEventCatch, KeyTaiko, KeyMania)
-from osrparse.replay import Replay, parse_replay_data
+from osrparse.columns import FrameColumns
+from osrparse.replay import (Replay, parse_replay_data, parse_replay_data_many,
+    DecodeLimits, LimitExceededError)
+from osrparse.table import HeaderTable
 
 __version__ = "6.0.0"
 
 
 __all__ = ["GameMode", "Mod", "Replay", "ReplayEvent", "Key",
     "ReplayEventOsu", "ReplayEventTaiko", "ReplayEventMania",
-    "ReplayEventCatch", "KeyTaiko", "KeyMania", "parse_replay_data"]
+    "ReplayEventCatch", "KeyTaiko", "KeyMania", "parse_replay_data",
+    "FrameColumns", "HeaderTable", "parse_replay_data_many", "DecodeLimits",
+    "LimitExceededError"]
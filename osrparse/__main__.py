@@ -0,0 +1,221 @@
+"""
+Command line interface for osrparse. Run ``python -m osrparse --help`` for
+usage.
+
+Every subcommand takes any number of paths, directories (searched recursively
+for ``.osr`` files), or glob patterns, and streams one record per replay (or
+per frame, for ``frames``) to stdout as either NDJSON or CSV.
+"""
+import argparse
+import glob
+import os
+import sys
+from pathlib import Path
+
+from osrparse.replay import _Unpacker, Replay
+from osrparse.utils import _imap
+
+# the fields written by the `headers` and `info` subcommands, in order.
+HEADER_FIELDS = ["mode", "game_version", "beatmap_hash", "username",
+    "replay_hash", "count_300", "count_100", "count_50", "count_geki",
+    "count_katu", "count_miss", "score", "max_combo", "perfect", "mods",
+    "timestamp", "replay_id"]
+INFO_FIELDS = HEADER_FIELDS + ["frames", "rng_seed"]
+FRAME_FIELDS = ["time_delta", "x", "y", "keys"]
+REPACK_FIELDS = ["output", "size_before", "size_after"]
+
+
+def iter_paths(patterns):
+    """
+    Yields the ``.osr`` files matched by ``patterns``, lazily.
+    """
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            yield from sorted(path.rglob("*.osr"))
+        elif path.exists():
+            yield path
+        else:
+            yield from (Path(p) for p in sorted(glob.glob(pattern,
+                recursive=True)))
+
+
+def _value(value):
+    # convert enums, flags and timestamps to plain values for output
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+class _Formatter:
+    """
+    Formats rows of ``fields`` as either NDJSON or CSV.
+    """
+    def __init__(self, fields, fmt):
+        self.fields = ["path"] + fields
+        self.fmt = fmt
+
+    def header(self):
+        if self.fmt == "csv":
+            return self.rows([self.fields], raw=True)
+        return ""
+
+    def rows(self, rows, *, raw=False):
+        if self.fmt == "csv":
+            import csv
+            import io
+
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerows(rows if raw else
+                ([_value(v) for v in row] for row in rows))
+            return out.getvalue()
+
+        import json
+
+        return "".join(json.dumps(dict(zip(self.fields,
+            [_value(v) for v in row]))) + "\n" for row in rows)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _headers(args, path):
+    header = _Unpacker(_read(path)).unpack_header()
+    row = [str(path)] + [header[field] for field in HEADER_FIELDS]
+    return _Formatter(HEADER_FIELDS, args.format).rows([row])
+
+
+def _info(args, path):
+    replay = _Unpacker(_read(path), columnar=True).unpack()
+    row = ([str(path)] + [getattr(replay, field) for field in HEADER_FIELDS] +
+        [len(replay.replay_data), replay.rng_seed])
+    return _Formatter(INFO_FIELDS, args.format).rows([row])
+
+
+def _frames(args, path):
+    frames = _Unpacker(_read(path), columnar=True).unpack().replay_data
+    path = str(path)
+
+    if args.format == "ndjson":
+        # formatting by hand is much faster than a `json.dumps` per frame
+        import json
+
+        template = ('{"path": ' + json.dumps(path) + ', "time_delta": %d, '
+            '"x": %r, "y": %r, "keys": %d}\n')
+        return "".join(template % row for row in zip(frames.time_delta,
+            frames.x, frames.y, frames.keys))
+
+    rows = zip([path] * len(frames), frames.time_delta, frames.x, frames.y,
+        frames.keys)
+    return _Formatter(FRAME_FIELDS, args.format).rows(rows, raw=True)
+
+
+def _repack(args, path):
+    data = _read(path)
+    replay = Replay.from_string(data)
+    output = Path(args.output) / Path(path).name
+    packed = replay.pack(dict_size=args.dict_size)
+    with open(output, "wb") as f:
+        f.write(packed)
+    row = [str(path), str(output), len(data), len(packed)]
+    return _Formatter(REPACK_FIELDS, args.format).rows([row])
+
+
+def _convert(args, path):
+    import json
+
+    replay = _Unpacker(_read(path), columnar=True).unpack()
+    record = {"path": str(path)}
+    record.update(replay.to_dict())
+    return json.dumps(record) + "\n"
+
+
+COMMANDS = {
+    "info": (_info, INFO_FIELDS,
+        "summarize replays, including their number of frames"),
+    "headers": (_headers, HEADER_FIELDS,
+        "print replay headers without decompressing the replay data"),
+    "frames": (_frames, FRAME_FIELDS, "print every frame of replays"),
+    "repack": (_repack, REPACK_FIELDS,
+        "parse and re-write replays into an output directory. Unmodified "
+        "play data is only recompressed if --dict-size is given"),
+    "convert": (_convert, None,
+        "convert replays to json documents, one per line")
+}
+
+
+class _Task:
+    # a picklable wrapper around a subcommand which reports errors instead of
+    # raising them, so one bad replay doesn't stop the whole run.
+    def __init__(self, function, args):
+        self.function = function
+        self.args = args
+
+    def __call__(self, path):
+        try:
+            return (self.function(self.args, path), None)
+        except Exception as e:
+            return (None, f"{path}: {type(e).__name__}: {e}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m osrparse",
+        description="Inspect and convert osu! replays.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, (_function, _fields, help_) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_)
+        subparser.add_argument("paths", nargs="+", help="replay files, "
+            "directories, or glob patterns")
+        subparser.add_argument("-j", "--jobs", type=int, default=1,
+            help="number of worker processes to use")
+        if name != "convert":
+            subparser.add_argument("-f", "--format", default="ndjson",
+                choices=["ndjson", "csv"], help="output format")
+        if name == "repack":
+            subparser.add_argument("-o", "--output", required=True,
+                help="directory to write repacked replays to")
+            subparser.add_argument("--dict-size", type=int, default=None,
+                help="lzma dictionary size to use")
+    return parser
+
+
+def main(argv=None, *, stdout=None, stderr=None):
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    args = build_parser().parse_args(argv)
+    (function, fields, _help) = COMMANDS[args.command]
+    if args.command == "convert":
+        args.format = "ndjson"
+    if args.command == "repack":
+        os.makedirs(args.output, exist_ok=True)
+
+    failed = False
+    try:
+        if fields is not None:
+            stdout.write(_Formatter(fields, args.format).header())
+        task = _Task(function, args)
+        for (output, error) in _imap(task, iter_paths(args.paths), args.jobs):
+            if error is not None:
+                failed = True
+                print(error, file=stderr)
+                continue
+            stdout.write(output)
+            stdout.flush()
+    except BrokenPipeError:
+        # the reader went away (eg `| head`). Point stdout at devnull so the
+        # interpreter doesn't complain again when flushing it on exit.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+from array import array
+from collections.abc import Sequence
+
+from osrparse.utils import (GameMode, Key, KeyTaiko, KeyMania, ReplayEventOsu,
+    ReplayEventTaiko, ReplayEventCatch, ReplayEventMania)
+
+# the typecodes of each column. Every mode shares the same layout so that
+# frame data can be moved around (eg into shared memory) without caring about
+# which mode it belongs to. Columns which a mode doesn't use are left at 0.
+TYPECODES = {
+    "time_delta": "i",
+    "x": "d",
+    "y": "d",
+    "keys": "i"
+}
+
+# the attributes of the replay events of each mode, which are also the names
+# of the columns in `FrameColumns.to_dict`.
+FIELDS = {
+    GameMode.STD: ("time_delta", "x", "y", "keys"),
+    GameMode.TAIKO: ("time_delta", "x", "keys"),
+    GameMode.CTB: ("time_delta", "x", "dashing"),
+    GameMode.MANIA: ("time_delta", "keys")
+}
+
+
+class FrameColumns(Sequence):
+    """
+    The replay data of a replay, stored as one typed array per attribute
+    instead of as a list of :class:`~osrparse.utils.ReplayEvent`.
+
+    Indexing or iterating a ``FrameColumns`` creates the corresponding
+    ``ReplayEvent`` on the fly, so it can be used anywhere a list of replay
+    events is expected, including as ``Replay.replay_data``.
+
+    Attributes
+    ----------
+    mode: GameMode
+        The game mode the frames belong to.
+    time_delta: array or memoryview
+        The time since the previous frame, for each frame.
+    x: array or memoryview
+        The x position of each frame. For osu!taiko this is the (unknown) x
+        value of the frame, and for osu!mania it is unused.
+    y: array or memoryview
+        The y position of each frame. Only used by osu!standard.
+    keys: array or memoryview
+        The keys pressed on each frame. For osu!catch this is ``1`` if the
+        player was dashing, and for osu!mania it is the ``KeyMania`` bitmask.
+
+    Notes
+    -----
+    The columns may be any object supporting the buffer and sequence
+    protocols with the typecodes in ``TYPECODES``, such as an
+    ``array.array`` or a cast ``memoryview``.
+    """
+    def __init__(self, mode, time_delta, x, y, keys):
+        self.mode = mode
+        self.time_delta = time_delta
+        self.x = x
+        self.y = y
+        self.keys = keys
+
+    @staticmethod
+    def from_events(events, mode):
+        """
+        Creates a new ``FrameColumns`` from a list of replay events.
+
+        Parameters
+        ----------
+        events: List[ReplayEvent]
+            The events to convert.
+        mode: GameMode
+            The game mode of ``events``.
+
+        Returns
+        -------
+        FrameColumns
+            The converted frames.
+        """
+        if isinstance(events, FrameColumns):
+            return events
+
+        time_delta = array("i", [e.time_delta for e in events])
+        n = len(time_delta)
+        x = array("d", bytes(8 * n))
+        y = array("d", bytes(8 * n))
+
+        if mode is GameMode.STD:
+            x = array("d", [e.x for e in events])
+            y = array("d", [e.y for e in events])
+            keys = array("i", [e.keys for e in events])
+        elif mode is GameMode.TAIKO:
+            x = array("d", [e.x for e in events])
+            keys = array("i", [e.keys for e in events])
+        elif mode is GameMode.CTB:
+            x = array("d", [e.x for e in events])
+            keys = array("i", [e.dashing for e in events])
+        elif mode is GameMode.MANIA:
+            keys = array("i", [e.keys for e in events])
+
+        return FrameColumns(mode, time_delta, x, y, keys)
+
+    @staticmethod
+    def from_string(replay_data_str, mode):
+        """
+        Parses the (decompressed) replay data portion of a replay directly
+        into columns, without creating an intermediate ``ReplayEvent`` for
+        each frame.
+
+        Parameters
+        ----------
+        replay_data_str: str or bytes
+            The decompressed replay data to parse.
+        mode: GameMode
+            What mode to parse the replay data as.
+
+        Returns
+        -------
+        (FrameColumns, Optional[int])
+            The parsed frames, and the rng seed of the replay or ``None`` if
+            not present.
+        """
+        sep = "," if isinstance(replay_data_str, str) else b","
+        bar = "|" if isinstance(replay_data_str, str) else b"|"
+        events = replay_data_str.split(sep)
+        # remove the empty event after the trailing comma
+        if events and not events[-1]:
+            events.pop()
+        events = [event.split(bar) for event in events]
+
+        rng_seed = None
+        if events and int(events[-1][0]) == -12345:
+            rng_seed = int(events.pop()[3])
+
+        n = len(events)
+        time_delta = array("i", [int(e[0]) for e in events])
+        zeros = bytes(8 * n)
+
+        if mode is GameMode.MANIA:
+            x = array("d", zeros)
+            keys = array("i", [int(e[1]) for e in events])
+        else:
+            x = array("d", [float(e[1]) for e in events])
+            keys = array("i", [int(e[3]) for e in events])
+
+        if mode is GameMode.STD:
+            y = array("d", [float(e[2]) for e in events])
+        else:
+            y = array("d", zeros)
+
+        return (FrameColumns(mode, time_delta, x, y, keys), rng_seed)
+
+    @staticmethod
+    def from_dict(columns, mode):
+        """
+        Creates a new ``FrameColumns`` from a dict of columns, as returned by
+        :meth:`to_dict`.
+
+        Parameters
+        ----------
+        columns: Dict[str, List]
+            The columns of the frames, keyed by the attribute names of the
+            replay events of ``mode``.
+        mode: GameMode
+            The game mode of the frames.
+
+        Returns
+        -------
+        FrameColumns
+            The frames.
+        """
+        time_delta = array("i", columns["time_delta"])
+        zeros = bytes(8 * len(time_delta))
+        x = array("d", columns["x"]) if "x" in columns else array("d", zeros)
+        y = array("d", columns["y"]) if "y" in columns else array("d", zeros)
+        if mode is GameMode.CTB:
+            keys = array("i", map(int, columns["dashing"]))
+        else:
+            keys = array("i", columns["keys"])
+        return FrameColumns(mode, time_delta, x, y, keys)
+
+    def column(self, field):
+        """
+        Returns the values of ``field`` for every frame as a list of plain
+        python values (ie ``int``, ``float``, or ``bool``).
+
+        Parameters
+        ----------
+        field: str
+            The attribute of the replay events to return. One of
+            ``FIELDS[self.mode]``.
+
+        Returns
+        -------
+        List
+            The values of ``field``.
+        """
+        if field == "dashing":
+            return [k == 1 for k in self.keys]
+        if field == "x" and self.mode is GameMode.TAIKO:
+            return [int(x) for x in self.x]
+        # both arrays and memoryviews support `tolist`
+        return getattr(self, field).tolist()
+
+    def to_dict(self):
+        """
+        Returns the columns of the frames relevant to ``mode``, as a dict of
+        lists keyed by the attribute names of the replay events of ``mode``.
+
+        Returns
+        -------
+        Dict[str, List]
+            The columns.
+        """
+        return {field: self.column(field) for field in FIELDS[self.mode]}
+
+    def to_string(self):
+        """
+        Serializes these frames to the (decompressed) replay data format, in
+        the same way ``Replay.pack`` serializes a list of replay events.
+
+        Returns
+        -------
+        str
+            The serialized frames.
+        """
+        mode = self.mode
+        t = self.time_delta
+        # `%r` formats floats the same way as f-strings do
+        if mode is GameMode.STD:
+            rows = zip(t, self.x, self.y, self.keys)
+            return "".join(map("%d|%r|%r|%d,".__mod__, rows))
+        if mode is GameMode.TAIKO:
+            rows = zip(t, self.x, self.keys)
+            return "".join(map("%d|%d|0|%d,".__mod__, rows))
+        if mode is GameMode.CTB:
+            rows = zip(t, self.x, (int(k == 1) for k in self.keys))
+            return "".join(map("%d|%r|0|%d,".__mod__, rows))
+        if mode is GameMode.MANIA:
+            rows = zip(t, self.keys)
+            return "".join(map("%d|%d|0|0,".__mod__, rows))
+
+    def copy(self):
+        """
+        Returns a copy of these frames, backed by new arrays.
+        """
+        return FrameColumns(self.mode, *(array(TYPECODES[name],
+            getattr(self, name).tobytes()) for name in TYPECODES))
+
+    def event(self, i):
+        """
+        Creates the ``ReplayEvent`` for the frame at index ``i``.
+        """
+        t = self.time_delta[i]
+        mode = self.mode
+        if mode is GameMode.STD:
+            return ReplayEventOsu(t, self.x[i], self.y[i], Key(self.keys[i]))
+        if mode is GameMode.TAIKO:
+            return ReplayEventTaiko(t, int(self.x[i]), KeyTaiko(self.keys[i]))
+        if mode is GameMode.CTB:
+            return ReplayEventCatch(t, self.x[i], self.keys[i] == 1)
+        if mode is GameMode.MANIA:
+            return ReplayEventMania(t, KeyMania(self.keys[i]))
+
+    def to_events(self):
+        """
+        Converts these frames to a list of replay events.
+
+        Returns
+        -------
+        List[ReplayEvent]
+            The converted frames.
+        """
+        return [self.event(i) for i in range(len(self))]
+
+    def __len__(self):
+        return len(self.time_delta)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.to_events()[i]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("frame index out of range")
+        return self.event(i)
+
+    def __iter__(self):
+        return map(self.event, range(len(self)))
+
+    def __eq__(self, other):
+        if isinstance(other, FrameColumns):
+            return (self.mode is other.mode and
+                all(getattr(self, name) == getattr(other, name)
+                    for name in TYPECODES))
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in
+                zip(self, other))
+        return NotImplemented
+
+    def __reduce__(self):
+        # columns mapped from shared memory are memoryviews, which can't be
+        # pickled, so copy them into arrays.
+        columns = []
+        for (name, typecode) in TYPECODES.items():
+            column = getattr(self, name)
+            if not isinstance(column, array):
+                column = array(typecode, column.tobytes())
+            columns.append(column)
+        return (FrameColumns, (self.mode, *columns))
+
+    def __repr__(self):
+        return f"FrameColumns(mode={self.mode}, frames={len(self)})"
@@ -0,0 +1,219 @@
+import math
+import statistics
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate, compress
+
+from osrparse.columns import FrameColumns
+from osrparse.utils import GameMode, Mod, _imap
+
+# the interval between frames osu! records at, in ms of real time.
+FRAME_TIME = 1000 / 60
+
+
+@dataclass
+class Kinematics:
+    """
+    The cursor kinematics of an osu!standard replay.
+
+    Only frames which move time forward are used: frames with a zero or
+    negative ``time_delta`` (and frames which don't get back past the latest
+    time seen after a negative ``time_delta``) are skipped, so every time
+    difference below is strictly positive.
+
+    Attributes
+    ----------
+    time: array
+        The absolute time of each used frame, in ms.
+    x: array
+        The x position of the cursor on each used frame.
+    y: array
+        The y position of the cursor on each used frame.
+    frame_time: array
+        The time between consecutive used frames, in ms. Has one less
+        element than ``time``.
+    velocity: array
+        The speed of the cursor between consecutive used frames, in
+        osu!pixels per ms. Has one less element than ``time``.
+    acceleration: array
+        The change in ``velocity`` per ms. Has two less elements than
+        ``time``.
+    jerk: array
+        The change in ``acceleration`` per ms. Has three less elements than
+        ``time``.
+    angle: array
+        The absolute change in direction of the cursor between consecutive
+        movements, in radians between ``0`` and ``pi``. A movement of length
+        ``0`` counts as no change in direction. Has two less elements than
+        ``time``.
+    summary: Dict[str, float]
+        Summary statistics of the above. See :func:`kinematics`.
+    """
+    time: array
+    x: array
+    y: array
+    frame_time: array
+    velocity: array
+    acceleration: array
+    jerk: array
+    angle: array
+    summary: dict
+
+
+def _diff(values):
+    return [b - a for (a, b) in zip(values, values[1:])]
+
+
+def _rate(values, frame_time):
+    # `values` are sampled at the end of each frame, so the time between two
+    # consecutive values is the frame time of the later frame.
+    return [d / t for (d, t) in zip(_diff(values), frame_time[1:])]
+
+
+def _angle(dx, dy):
+    headings = [math.atan2(y, x) for (x, y) in zip(dx, dy)]
+    moved = [x != 0 or y != 0 for (x, y) in zip(dx, dy)]
+    angle = []
+    for (a, b, moved_a, moved_b) in zip(headings, headings[1:], moved,
+        moved[1:]):
+        if not (moved_a and moved_b):
+            angle.append(0.0)
+            continue
+        change = abs(b - a)
+        angle.append(2 * math.pi - change if change > math.pi else change)
+    return angle
+
+
+def _stats(prefix, values):
+    if not values:
+        return {f"{prefix}_mean": 0.0, f"{prefix}_std": 0.0,
+            f"{prefix}_max": 0.0}
+    return {
+        f"{prefix}_mean": statistics.fmean(values),
+        f"{prefix}_std": statistics.pstdev(values),
+        f"{prefix}_max": max(values)
+    }
+
+
+def kinematics(replay, *, snap_angle=math.pi / 2):
+    """
+    Computes the cursor kinematics of an osu!standard replay.
+
+    Parameters
+    ----------
+    replay: Replay
+        The replay to compute the kinematics of.
+    snap_angle: float
+        The change in direction, in radians, above which a fast movement is
+        counted as a snap.
+
+    Returns
+    -------
+    Kinematics
+        The kinematics of the replay. Its ``summary`` contains:
+
+        * ``frames``: the number of used frames.
+        * ``duration``: the time between the first and last used frame.
+        * ``velocity_{mean,std,max}``, ``acceleration_{mean,std,max}``, and
+          ``jerk_{mean,std,max}``: statistics of the absolute values of the
+          corresponding arrays.
+        * ``angle_mean``: the mean change in direction.
+        * ``snaps``: the number of changes in direction greater than
+          ``snap_angle`` while moving faster than the median velocity.
+        * ``frame_time_{mean,std,max}`` and ``frame_time_median``:
+          statistics of the frame times.
+        * ``frame_time_ratio``: the median frame time divided by the frame
+          time osu! records at, scaled by the speed of the replay's mods.
+          Replays which were slowed down while playing (timewarped) have
+          noticeably lower values than unmodified ones.
+        * ``skipped``: the number of frames which were not used.
+
+    Raises
+    ------
+    ValueError
+        If ``replay`` is not an osu!standard replay.
+    """
+    if replay.mode is not GameMode.STD:
+        raise ValueError("Expected an osu!standard replay, but got a replay "
+            f"with mode {replay.mode}")
+
+    columns = FrameColumns.from_events(replay.replay_data, replay.mode)
+    time_delta = columns.time_delta.tolist()
+    times = list(accumulate(time_delta))
+    # the latest time seen before each frame
+    latest = [-math.inf] + list(accumulate(times, max))[:-1]
+    keep = [d > 0 and t > l for (d, t, l) in zip(time_delta, times, latest)]
+
+    time = list(compress(times, keep))
+    x = list(compress(columns.x.tolist(), keep))
+    y = list(compress(columns.y.tolist(), keep))
+
+    frame_time = _diff(time)
+    dx = _diff(x)
+    dy = _diff(y)
+    velocity = [math.hypot(a, b) / t for (a, b, t) in zip(dx, dy,
+        frame_time)]
+    acceleration = _rate(velocity, frame_time)
+    jerk = _rate(acceleration, frame_time[1:])
+    angle = _angle(dx, dy)
+
+    summary = {"frames": len(time), "duration":
+        float(time[-1] - time[0]) if time else 0.0}
+    summary.update(_stats("velocity", velocity))
+    summary.update(_stats("acceleration", [abs(a) for a in acceleration]))
+    summary.update(_stats("jerk", [abs(j) for j in jerk]))
+    summary["angle_mean"] = statistics.fmean(angle) if angle else 0.0
+
+    median_velocity = statistics.median(velocity) if velocity else 0.0
+    summary["snaps"] = sum(1 for (a, v) in zip(angle, velocity[1:])
+        if a > snap_angle and v > median_velocity)
+
+    summary.update(_stats("frame_time", frame_time))
+    median_frame_time = statistics.median(frame_time) if frame_time else 0.0
+    summary["frame_time_median"] = median_frame_time
+    rate = 1.0
+    if replay.mods & (Mod.DoubleTime | Mod.Nightcore):
+        rate = 1.5
+    elif replay.mods & Mod.HalfTime:
+        rate = 0.75
+    summary["frame_time_ratio"] = median_frame_time / (FRAME_TIME * rate)
+    summary["skipped"] = len(time_delta) - len(time)
+
+    return Kinematics(array("d", time), array("d", x), array("d", y),
+        array("d", frame_time), array("d", velocity),
+        array("d", acceleration), array("d", jerk), array("d", angle),
+        summary)
+
+
+def _kinematics_one(replay):
+    # defined at the top level so it can be pickled for worker processes
+    from osrparse.replay import Replay, _Unpacker
+
+    if not isinstance(replay, Replay):
+        with open(replay, "rb") as f:
+            replay = _Unpacker(f.read(), columnar=True).unpack()
+    return kinematics(replay)
+
+
+def kinematics_many(replays, *, workers=1):
+    """
+    Computes the cursor kinematics of many osu!standard replays.
+
+    Parameters
+    ----------
+    replays: Iterable[Replay or str or os.PathLike]
+        The replays to compute the kinematics of, or paths to them. Paths are
+        parsed in the worker processes, which avoids sending the replay data
+        to them.
+    workers: int
+        The number of worker processes to use. If ``1``, everything is
+        computed in this process.
+
+    Returns
+    -------
+    Iterator[Kinematics]
+        The kinematics of each replay, in the order of ``replays``. Replays
+        are consumed lazily, so ``replays`` may be an arbitrarily long
+        iterator.
+    """
+    return _imap(_kinematics_one, replays, workers)
@@ -1,13 +1,135 @@
-import lzma
+from __future__ import annotations
+
 import struct
-from datetime import datetime, timezone, timedelta
 from typing import List, Optional
-import base64
 from dataclasses import dataclass
+# `datetime` has to be imported here so that `typing.get_type_hints(Replay)`
+# can resolve the annotation of `timestamp`.
+from datetime import datetime, timezone, timedelta
+# `lzma` and `base64` are imported where they are needed instead of here, so
+# that importing osrparse (eg to start the cli) stays fast.
 
 from osrparse.utils import (Mod, GameMode, ReplayEvent, ReplayEventOsu,
     ReplayEventCatch, ReplayEventMania, ReplayEventTaiko, Key, KeyMania,
-    KeyTaiko, LifeBarState)
+    KeyTaiko, LifeBarState, _imap, _batches)
+from osrparse.columns import FrameColumns, FIELDS, TYPECODES
+
+
+class LimitExceededError(ValueError):
+    """
+    Raised when a replay exceeds one of the limits of a
+    :class:`DecodeLimits` while being parsed.
+    """
+
+
+@dataclass
+class DecodeLimits:
+    """
+    Limits on the resources parsing a replay may use, for parsing untrusted
+    replays. Each limit is checked as early as possible, before the memory it
+    guards is allocated, and raises :class:`LimitExceededError` if exceeded.
+    A limit of ``None`` means no limit.
+
+    Attributes
+    ----------
+    max_compressed_size: Optional[int]
+        The maximum size of the compressed replay data, in bytes.
+    max_decompressed_size: Optional[int]
+        The maximum size of the replay data after decompression, in bytes.
+        This protects against decompression bombs: decompression stops as soon
+        as it produces more than this many bytes.
+    max_frames: Optional[int]
+        The maximum number of frames in the replay data.
+    max_string_length: Optional[int]
+        The maximum length of any string in the replay (eg ``username`` or
+        the life bar), in bytes.
+    max_memory: Optional[int]
+        The maximum memory the lzma decoder may use, in bytes. The decoder
+        allocates a dictionary of whatever size the compressed data declares
+        in its header, before producing any output. If ``None`` and
+        ``max_decompressed_size`` is set, this defaults to
+        ``max_decompressed_size`` plus 16 MiB, which is plenty for any
+        dictionary osu! writes.
+    """
+    max_compressed_size: Optional[int] = None
+    max_decompressed_size: Optional[int] = None
+    max_frames: Optional[int] = None
+    max_string_length: Optional[int] = None
+    max_memory: Optional[int] = None
+
+    def check(self, name, value):
+        limit = getattr(self, f"max_{name}")
+        if limit is not None and value > limit:
+            raise LimitExceededError(f"{name.replace('_', ' ')} of {value} "
+                f"exceeds the limit of {limit}")
+
+    def memory_limit(self):
+        if self.max_memory is not None:
+            return self.max_memory
+        if self.max_decompressed_size is not None:
+            return self.max_decompressed_size + _LZMA_MEMORY_MARGIN
+        return None
+
+    def decompress(self, data):
+        import lzma
+
+        self.check("compressed_size", len(data))
+        limit = self.max_decompressed_size
+        memlimit = self.memory_limit()
+        if limit is None and memlimit is None:
+            return lzma.decompress(data, format=lzma.FORMAT_AUTO)
+
+        decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_AUTO,
+            memlimit=memlimit)
+        # ask for one byte more than the limit, so we can tell the difference
+        # between hitting the limit and exceeding it
+        max_length = -1 if limit is None else limit + 1
+        try:
+            data = decompressor.decompress(data, max_length=max_length)
+        except lzma.LZMAError as e:
+            if "memory usage limit" in str(e).lower():
+                raise LimitExceededError("decoding the replay data needs "
+                    f"more memory than the limit of {memlimit}") from e
+            raise
+        if limit is not None and len(data) > limit:
+            raise LimitExceededError("decompressed size exceeds the limit of "
+                f"{limit}")
+        if not decompressor.eof:
+            raise lzma.LZMAError("Compressed data ended before the "
+                "end-of-stream marker was reached")
+        return data
+
+    def check_frames(self, data):
+        if self.max_frames is None:
+            return
+        # every frame ends with a comma, so we can count frames without
+        # splitting the data
+        comma = b"," if isinstance(data, bytes) else ","
+        frames = data.count(comma)
+        if frames > self.max_frames:
+            # the rng seed is stored as a frame at the end, and doesn't count
+            last_frame = data[data.rfind(comma, 0, len(data) - 1) + 1:]
+            seed = b"-12345|" if isinstance(data, bytes) else "-12345|"
+            if last_frame.startswith(seed):
+                frames -= 1
+        self.check("frames", frames)
+
+
+# used when no limits are given
+_NO_LIMITS = DecodeLimits()
+# the memory the lzma decoder may use on top of `max_decompressed_size`, if
+# `max_memory` isn't given. osu! uses a dictionary of at most a few MiB.
+_LZMA_MEMORY_MARGIN = 1 << 24
+
+# the attributes stored one after another between the replay hash and the
+# life bar (the six counts, score, max combo, perfect, and mods), so that
+# they can be unpacked and packed in a single call. Counts and scores are
+# written unsigned, as osu! does.
+_FIXED = struct.Struct("<6hih?i")
+_FIXED_PACK = struct.Struct("<6HIHBI")
+# every other format `_Unpacker.unpack_once` has been called with, compiled
+# once.
+_STRUCTS = {}
 
 
 class _Unpacker:
@@ -15,9 +137,16 @@ class _Unpacker:
     Helper class for dealing with the ``.osr`` format. Not intended to be used
     by consumers.
     """
-    def __init__(self, replay_data):
+    def __init__(self, replay_data, *, columnar=False, limits=None):
         self.replay_data = replay_data
+        self.columnar = columnar
+        self.limits = limits or _NO_LIMITS
         self.offset = 0
+        # the raw bytes of the life bar and play data, kept so that they can
+        # be written back out verbatim if they weren't modified.
+        self.life_bar_bytes = None
+        self.play_data_bytes = None
+        self.fingerprint = None
 
     def string_length(self, binarystream):
         result = 0
@@ -37,6 +166,7 @@ class _Unpacker:
         elif self.replay_data[self.offset] == 0x0b:
             self.offset += 1
             string_length = self.string_length(self.replay_data)
+            self.limits.check("string_length", string_length)
             offset_end = self.offset + string_length
             string = self.replay_data[self.offset:offset_end].decode("utf-8")
             self.offset = offset_end
@@ -45,15 +175,37 @@ class _Unpacker:
             raise ValueError("Expected the first byte of a string to be 0x00 "
                 f"or 0x0b, but got {self.replay_data[self.offset]}")
 
+    def skip_string(self):
+        # like `unpack_string`, but without decoding the string
+        if self.replay_data[self.offset] == 0x0b:
+            self.offset += 1
+            string_length = self.string_length(self.replay_data)
+            self.limits.check("string_length", string_length)
+            self.offset += string_length
+        elif self.replay_data[self.offset] == 0x00:
+            self.offset += 1
+        else:
+            raise ValueError("Expected the first byte of a string to be 0x00 "
+                f"or 0x0b, but got {self.replay_data[self.offset]}")
+
     def unpack_once(self, specifier):
-        # always use little endian
-        specifier = f"<{specifier}"
-        unpacked = struct.unpack_from(specifier, self.replay_data, self.offset)
-        self.offset += struct.calcsize(specifier)
-        # `struct.unpack_from` always returns a tuple, even if there's only one
+        compiled = _STRUCTS.get(specifier)
+        if compiled is None:
+            # always use little endian
+            compiled = _STRUCTS[specifier] = struct.Struct(f"<{specifier}")
+        unpacked = compiled.unpack_from(self.replay_data, self.offset)
+        self.offset += compiled.size
+        # `unpack_from` always returns a tuple, even if there's only one
         # element
         return unpacked[0]
 
+    def unpack_fixed(self):
+        # unpacks count_300 through mods in one go. Returns a tuple of those
+        # attributes, in the order they are stored.
+        unpacked = _FIXED.unpack_from(self.replay_data, self.offset)
+        self.offset += _FIXED.size
+        return unpacked
+
     def unpack_timestamp(self):
         ticks = self.unpack_once("q")
         timestamp = datetime.min + timedelta(microseconds=ticks/10)
@@ -61,12 +213,22 @@ class _Unpacker:
         return timestamp
 
     def unpack_play_data(self, mode):
+        offset_start = self.offset
         replay_length = self.unpack_once("i")
+        self.limits.check("compressed_size", replay_length)
         offset_end = self.offset + replay_length
         data = self.replay_data[self.offset:offset_end]
-        data = lzma.decompress(data, format=lzma.FORMAT_AUTO)
-        data = data.decode("ascii")
-        (replay_data, rng_seed) = self.parse_replay_data(data, mode)
+        data = self.limits.decompress(data)
+        self.limits.check_frames(data)
+        # parsing to columns and then creating events from them is as fast as
+        # parsing to events directly, and leaves us with columns to
+        # fingerprint.
+        (frames, rng_seed) = FrameColumns.from_string(data, mode)
+        # fingerprint the frames before handing them out, as columnar replay
+        # data may be modified in place
+        self.fingerprint = _fingerprint(frames)
+        replay_data = frames if self.columnar else frames.to_events()
+        self.play_data_bytes = bytes(self.replay_data[offset_start:offset_end])
         self.offset = offset_end
         return (replay_data, rng_seed)
 
@@ -120,7 +282,13 @@ class _Unpacker:
         return replay_id
 
     def unpack_life_bar(self):
+        offset_start = self.offset
         life_bar = self.unpack_string()
+        self.life_bar_bytes = bytes(self.replay_data[offset_start:self.offset])
+        return self.parse_life_bar(life_bar)
+
+    @staticmethod
+    def parse_life_bar(life_bar):
         if not life_bar:
             return None
 
@@ -130,36 +298,116 @@ class _Unpacker:
 
         return [LifeBarState(int(s[0]), float(s[1])) for s in states]
 
-    def unpack(self):
-        mode = GameMode(self.unpack_once("b"))
+    def skip_play_data(self):
+        replay_length = self.unpack_once("i")
+        self.offset += replay_length
+
+    def unpack_fields(self, *, raw=False):
+        # unpacks every attribute stored before the play data. If `raw`, the
+        # life bar is skipped (and left as None), and `mode`, `mods`, and
+        # `timestamp` (in windows ticks) are left as ints, which is all a
+        # bulk header scan needs.
+        mode = self.unpack_once("b")
         game_version = self.unpack_once("i")
         beatmap_hash = self.unpack_string()
         username = self.unpack_string()
         replay_hash = self.unpack_string()
-        count_300 = self.unpack_once("h")
-        count_100 = self.unpack_once("h")
-        count_50 = self.unpack_once("h")
-        count_geki = self.unpack_once("h")
-        count_katu = self.unpack_once("h")
-        count_miss = self.unpack_once("h")
-        score = self.unpack_once("i")
-        max_combo = self.unpack_once("h")
-        perfect = self.unpack_once("?")
-        mods = Mod(self.unpack_once("i"))
-        life_bar_graph = self.unpack_life_bar()
-        timestamp = self.unpack_timestamp()
-        (replay_data, rng_seed) = self.unpack_play_data(mode)
+        (count_300, count_100, count_50, count_geki, count_katu, count_miss,
+            score, max_combo, perfect, mods) = self.unpack_fixed()
+        if raw:
+            self.skip_string()
+            life_bar_graph = None
+            timestamp = self.unpack_once("q")
+        else:
+            mode = GameMode(mode)
+            mods = Mod(mods)
+            life_bar_graph = self.unpack_life_bar()
+            timestamp = self.unpack_timestamp()
+
+        return {"mode": mode, "game_version": game_version,
+            "beatmap_hash": beatmap_hash, "username": username,
+            "replay_hash": replay_hash, "count_300": count_300,
+            "count_100": count_100, "count_50": count_50,
+            "count_geki": count_geki, "count_katu": count_katu,
+            "count_miss": count_miss, "score": score, "max_combo": max_combo,
+            "perfect": perfect, "mods": mods,
+            "life_bar_graph": life_bar_graph, "timestamp": timestamp}
+
+    def unpack_header(self):
+        # unpacks every attribute except the replay data and rng seed, without
+        # decompressing the play data.
+        header = self.unpack_fields()
+        self.skip_play_data()
+        header["replay_id"] = self.unpack_replay_id()
+        return header
+
+    def unpack(self):
+        header = self.unpack_fields()
+        (replay_data, rng_seed) = self.unpack_play_data(header["mode"])
         replay_id = self.unpack_replay_id()
 
-        return Replay(mode, game_version, beatmap_hash, username,
-            replay_hash, count_300, count_100, count_50, count_geki, count_katu,
-            count_miss, score, max_combo, perfect, mods, life_bar_graph,
-            timestamp, replay_data, replay_id, rng_seed)
+        replay = Replay(**header, replay_data=replay_data,
+            replay_id=replay_id, rng_seed=rng_seed)
+        # a plain attribute rather than a dataclass field, so that it doesn't
+        # show up in `fields`, `asdict`, or `astuple`
+        replay._original = _Original(header["mode"], rng_seed,
+            self.fingerprint, self.play_data_bytes, self.life_bar_bytes)
+        return replay
+
+
+def _fingerprint(frames):
+    # a digest of every column of `frames`. Much smaller than keeping a copy
+    # of the frames around, and as cheap to compare against.
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    for name in TYPECODES:
+        digest.update(getattr(frames, name))
+    return digest.digest()
+
+
+@dataclass
+class _Original:
+    """
+    The original play data and life bar of a parsed replay, as they were
+    stored in the replay. Not intended to be used by consumers.
+    """
+    mode: GameMode
+    rng_seed: Optional[int]
+    # the fingerprint of the frames as they were parsed, to compare the
+    # current replay data against
+    fingerprint: bytes
+    # the compressed play data, including its length prefix
+    play_data: bytes
+    # the life bar, including its string prefix
+    life_bar: bytes
+
+    def play_data_unchanged(self, replay):
+        if replay.mode is not self.mode or replay.rng_seed != self.rng_seed:
+            return False
+        try:
+            frames = FrameColumns.from_events(replay.replay_data, replay.mode)
+        # the replay data was replaced with something we can't represent as
+        # columns (eg events of another mode), so it definitely changed
+        except (AttributeError, TypeError, OverflowError):
+            return False
+        return _fingerprint(frames) == self.fingerprint
+
+    def life_bar_unchanged(self, replay):
+        life_bar = _Unpacker(self.life_bar).unpack_string()
+        return _Unpacker.parse_life_bar(life_bar) == replay.life_bar_graph
 
 
 class _Packer:
     def __init__(self, replay, *, dict_size=None, mode=None):
+        import lzma
+
         self.replay = replay
+        # only copy the original play data when no compression settings were
+        # asked for. Otherwise the caller expects it to be recompressed.
+        self.original = None
+        if dict_size is None and mode is None:
+            self.original = getattr(replay, "_original", None)
         self.dict_size = dict_size or 1 << 21
         self.mode = mode or lzma.MODE_FAST
 
@@ -185,7 +433,7 @@ class _Packer:
 
             if (i == 0 and byte & 0x40 == 0) or (i == -1 and byte & 0x40 != 0):
                 r.append(byte)
-                return b"".join(map(self.pack_byte, r))
+                return bytes(r)
 
             r.append(0x80 | byte)
 
@@ -206,6 +454,10 @@ class _Packer:
         return self.pack_long(ticks)
 
     def pack_life_bar(self):
+        original = self.original
+        if original is not None and original.life_bar_unchanged(self.replay):
+            return original.life_bar
+
         data = ""
         if self.replay.life_bar_graph is None:
             return self.pack_string(data)
@@ -221,8 +473,20 @@ class _Packer:
         return self.pack_string(data)
 
     def pack_replay_data(self):
+        import lzma
+
+        original = self.original
+        if original is not None and original.play_data_unchanged(self.replay):
+            return original.play_data
+
         data = ""
-        for event in self.replay.replay_data:
+        if isinstance(self.replay.replay_data, FrameColumns):
+            data = self.replay.replay_data.to_string()
+            events = []
+        else:
+            events = self.replay.replay_data
+
+        for event in events:
             t = event.time_delta
             if isinstance(event, ReplayEventOsu):
                 data += f"{t}|{event.x}|{event.y}|{event.keys.value},"
@@ -250,31 +514,29 @@ class _Packer:
 
         return self.pack_int(len(compressed)) + compressed
 
-    def pack(self):
+    def pack_fixed(self):
         r = self.replay
-        data = b""
-
-        data += self.pack_byte(r.mode.value)
-        data += self.pack_int(r.game_version)
-        data += self.pack_string(r.beatmap_hash)
-        data += self.pack_string(r.username)
-        data += self.pack_string(r.replay_hash)
-        data += self.pack_short(r.count_300)
-        data += self.pack_short(r.count_100)
-        data += self.pack_short(r.count_50)
-        data += self.pack_short(r.count_geki)
-        data += self.pack_short(r.count_katu)
-        data += self.pack_short(r.count_miss)
-        data += self.pack_int(r.score)
-        data += self.pack_short(r.max_combo)
-        data += self.pack_byte(r.perfect)
-        data += self.pack_int(r.mods.value)
-        data += self.pack_life_bar()
-        data += self.pack_timestamp()
-        data += self.pack_replay_data()
-        data += self.pack_long(r.replay_id)
+        return _FIXED_PACK.pack(r.count_300, r.count_100, r.count_50,
+            r.count_geki, r.count_katu, r.count_miss, r.score, r.max_combo,
+            r.perfect, r.mods.value)
 
-        return data
+    def pack(self):
+        r = self.replay
+        # join the parts once at the end, instead of copying everything
+        # packed so far for every part
+        parts = [
+            self.pack_byte(r.mode.value),
+            self.pack_int(r.game_version),
+            self.pack_string(r.beatmap_hash),
+            self.pack_string(r.username),
+            self.pack_string(r.replay_hash),
+            self.pack_fixed(),
+            self.pack_life_bar(),
+            self.pack_timestamp(),
+            self.pack_replay_data(),
+            self.pack_long(r.replay_id)
+        ]
+        return b"".join(parts)
 
 
 @dataclass
@@ -320,7 +582,12 @@ class Replay:
         The life bar of this replay over time.
     replay_data: List[ReplayEvent]
         The replay data of the replay, including cursor position and keys
-        pressed.
+        pressed. This may also be a :class:`~osrparse.columns.FrameColumns`
+        (eg the replay data of a transformed replay, or when asked for with
+        ``columnar=True``), which behaves like a read only list of replay
+        events: its events are created on every access, so modifying one
+        doesn't modify the replay. Use ``replay_data.to_events()`` to get a
+        list which can be modified.
     replay_id: int
         The replay id of this replay, or 0 if not submitted.
     rng_seed: Optional[int]
@@ -348,8 +615,16 @@ class Replay:
     replay_id: int
     rng_seed: Optional[int]
 
+    def __getstate__(self):
+        # the original play data (see `_Original`) is only kept to repack an
+        # unmodified replay verbatim. Leave it out of pickles, so sending
+        # replays between processes isn't slowed down by it.
+        state = self.__dict__.copy()
+        state.pop("_original", None)
+        return state
+
     @staticmethod
-    def from_path(path):
+    def from_path(path, *, limits=None):
         """
         Creates a new ``Replay`` object from the ``.osr`` file at the given
         ``path``.
@@ -358,6 +633,8 @@ class Replay:
         ----------
         path: str or os.PathLike
             The path to the osr file to read from.
+        limits: Optional[DecodeLimits]
+            The limits to enforce while parsing, or ``None`` for no limits.
 
         Returns
         -------
@@ -365,10 +642,10 @@ class Replay:
             The parsed replay object.
         """
         with open(path, "rb") as f:
-            return Replay.from_file(f)
+            return Replay.from_file(f, limits=limits)
 
     @staticmethod
-    def from_file(file):
+    def from_file(file, *, limits=None):
         """
         Creates a new ``Replay`` object from an open file object.
 
@@ -376,6 +653,8 @@ class Replay:
         ----------
         file: file-like
            The file object to read from.
+        limits: Optional[DecodeLimits]
+            The limits to enforce while parsing, or ``None`` for no limits.
 
         Returns
         -------
@@ -383,10 +662,10 @@ class Replay:
             The parsed replay object.
         """
         data = file.read()
-        return Replay.from_string(data)
+        return Replay.from_string(data, limits=limits)
 
     @staticmethod
-    def from_string(data):
+    def from_string(data, *, limits=None):
         """
         Creates a new ``Replay`` object from a string containing ``.osr`` data.
 
@@ -394,13 +673,15 @@ class Replay:
         ----------
         data: str
            The data to parse.
+        limits: Optional[DecodeLimits]
+            The limits to enforce while parsing, or ``None`` for no limits.
 
         Returns
         -------
         Replay
             The parsed replay object.
         """
-        return _Unpacker(data).unpack()
+        return _Unpacker(data, limits=limits).unpack()
 
     def write_path(self, path, *, dict_size=None, mode=None):
         """
@@ -442,12 +723,216 @@ class Replay:
         -------
         str
             The text representing this ``Replay``, in ``.osr`` format.
+
+        Notes
+        -----
+        If this replay was parsed, and its replay data, rng seed, and life bar
+        are unchanged since (including edits to individual replay events),
+        the original compressed play data and life bar are copied verbatim
+        instead of being re-serialized. Passing ``dict_size`` or ``mode``
+        always recompresses the play data.
         """
         return _Packer(self, dict_size=dict_size, mode=mode).pack()
 
+    @staticmethod
+    def from_dict(data, *, columnar=False):
+        """
+        Creates a new ``Replay`` object from a dict, as returned by
+        :meth:`to_dict`.
+
+        Parameters
+        ----------
+        data: dict
+           The dict to create the replay from. ``replay_data`` may be in
+           either the ``"columnar"`` or ``"rows"`` format. If it is missing,
+           ``replay_data`` will be ``None``.
+        columnar: bool
+           Whether to keep the replay data as a (read only)
+           :class:`~osrparse.columns.FrameColumns` instead of converting it
+           to a list of replay events, which is much faster for long replays.
+
+        Returns
+        -------
+        Replay
+            The replay.
+        """
+        mode = GameMode(data["mode"])
+        life_bar_graph = data["life_bar_graph"]
+        if life_bar_graph is not None:
+            life_bar_graph = [LifeBarState(time, life) for (time, life) in
+                life_bar_graph]
+
+        replay_data = data.get("replay_data")
+        if isinstance(replay_data, dict):
+            replay_data = FrameColumns.from_dict(replay_data, mode)
+        elif replay_data is not None:
+            fields = FIELDS[mode]
+            columns = dict(zip(fields, zip(*replay_data))) if replay_data \
+                else {field: [] for field in fields}
+            replay_data = FrameColumns.from_dict(columns, mode)
+        if replay_data is not None and not columnar:
+            replay_data = replay_data.to_events()
+
+        scalars = {field: data[field] for field in _SCALAR_FIELDS}
+        return Replay(mode=mode, mods=Mod(data["mods"]),
+            life_bar_graph=life_bar_graph,
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            replay_data=replay_data, replay_id=data["replay_id"],
+            rng_seed=data["rng_seed"], **scalars)
+
+    def to_dict(self, *, frames="columnar"):
+        """
+        Returns a dict representing this ``Replay``, containing only values
+        which can be serialized to json.
+
+        Parameters
+        ----------
+        frames: str or None
+            How to represent the replay data. One of:
+
+            * ``"columnar"``: a dict mapping each attribute of the replay
+              events (eg ``"time_delta"``, ``"x"``) to a list of its values.
+            * ``"rows"``: a list of lists, with one list of attribute values
+              per replay event, in the order of the columnar format.
+            * ``None``: the replay data is left out.
+
+            If this replay has no replay data, ``replay_data`` is ``None``
+            for either of the first two formats.
+
+        Returns
+        -------
+        dict
+            The dict representing this replay. ``mode``, ``mods`` and
+            ``rng_seed`` are stored as ints, ``timestamp`` as an iso 8601
+            string, and ``life_bar_graph`` as a list of ``[time, life]``
+            pairs.
+
+        Notes
+        -----
+        This is much faster than ``dataclasses.asdict``, as it never creates
+        a dict (or copy) per replay event.
+        """
+        if frames not in ["columnar", "rows", None]:
+            raise ValueError("Expected frames to be one of 'columnar', "
+                f"'rows', or None, but got {frames!r}")
+
+        data = {"mode": self.mode.value}
+        data.update((field, getattr(self, field)) for field in _SCALAR_FIELDS)
+        data["perfect"] = bool(self.perfect)
+        data["mods"] = int(self.mods)
+        life_bar_graph = self.life_bar_graph
+        if life_bar_graph is not None:
+            life_bar_graph = [[s.time, s.life] for s in life_bar_graph]
+        data["life_bar_graph"] = life_bar_graph
+        data["timestamp"] = self.timestamp.isoformat()
+        data["replay_id"] = self.replay_id
+        data["rng_seed"] = self.rng_seed
+
+        if frames is None:
+            return data
+        if self.replay_data is None:
+            # eg a replay created from a dict without replay data
+            data["replay_data"] = None
+            return data
+
+        columns = FrameColumns.from_events(self.replay_data, self.mode)
+        columns = columns.to_dict()
+        if frames == "columnar":
+            data["replay_data"] = columns
+        else:
+            data["replay_data"] = [list(row) for row in
+                zip(*columns.values())]
+        return data
+
+    def to_json(self, *, frames="columnar"):
+        """
+        Returns a json string representing this ``Replay``. See
+        :meth:`to_dict` for the available ``frames`` formats.
+
+        Returns
+        -------
+        str
+            The json representing this replay.
+        """
+        import json
+
+        return json.dumps(self.to_dict(frames=frames))
+
+    def write_json(self, file, *, frames="columnar"):
+        """
+        Writes the json representing this ``Replay`` to an open (text) file
+        object. This writes the replay data in chunks, and never holds the
+        full json string in memory. See :meth:`to_dict` for the available
+        ``frames`` formats.
+
+        Parameters
+        ----------
+        file: file-like
+           The file object to write to.
+        """
+        import json
+
+        header = self.to_dict(frames=None)
+        if frames is None:
+            file.write(json.dumps(header))
+            return
+
+        if frames not in ["columnar", "rows"]:
+            raise ValueError("Expected frames to be one of 'columnar', "
+                f"'rows', or None, but got {frames!r}")
+
+        if self.replay_data is None:
+            header["replay_data"] = None
+            file.write(json.dumps(header))
+            return
+
+        from itertools import islice
+
+        columns = FrameColumns.from_events(self.replay_data, self.mode)
+        columns = columns.to_dict()
+
+        def write_chunked(values):
+            values = iter(values)
+            file.write("[")
+            chunk = list(islice(values, _JSON_CHUNK_SIZE))
+            while chunk:
+                file.write(json.dumps(chunk)[1:-1])
+                chunk = list(islice(values, _JSON_CHUNK_SIZE))
+                if chunk:
+                    file.write(", ")
+            file.write("]")
+
+        # drop the closing brace, and append the replay data ourselves
+        file.write(json.dumps(header)[:-1])
+        file.write(', "replay_data": ')
+        if frames == "columnar":
+            file.write("{")
+            for i, (field, values) in enumerate(columns.items()):
+                if i:
+                    file.write(", ")
+                file.write(f"{json.dumps(field)}: ")
+                write_chunked(values)
+            file.write("}")
+        else:
+            # tuples are serialized as json arrays
+            write_chunked(zip(*columns.values()))
+        file.write("}")
+
+
+# the attributes of a replay which are serialized as-is by `Replay.to_dict`
+_SCALAR_FIELDS = ["game_version", "beatmap_hash", "username", "replay_hash",
+    "count_300", "count_100", "count_50", "count_geki", "count_katu",
+    "count_miss", "score", "max_combo", "perfect"]
+# values are written to json in chunks of this many frames by
+# `Replay.write_json`
+_JSON_CHUNK_SIZE = 1 << 16
+# how many payloads each worker process parses at a time in
+# `parse_replay_data_many`
+_PAYLOAD_BATCH_SIZE = 64
+
 
 def parse_replay_data(data_string, *, decoded=False, decompressed=False,
-    mode=GameMode.STD) -> List[ReplayEvent]:
+    mode=GameMode.STD, limits=None) -> List[ReplayEvent]:
     """
     Parses the replay data portion of a replay from a string. This method is
     siutable for use with the replay data returned by api v1's ``/get_replay``
@@ -477,12 +962,91 @@ def parse_replay_data(data_string, *, decoded=False, decompressed=False,
         ``data_string`` is not base 64 encoded).
     mode: GameMode
         What mode to parse the replay data as.
+    limits: Optional[DecodeLimits]
+        The limits to enforce while parsing, or ``None`` for no limits.
     """
+    import base64
+
+    limits = limits or _NO_LIMITS
     # assume the data is already decoded if it's been decompressed
     if not decoded and not decompressed:
         data_string = base64.b64decode(data_string)
     if not decompressed:
-        data_string = lzma.decompress(data_string, format=lzma.FORMAT_AUTO)
+        data_string = limits.decompress(data_string)
         data_string = data_string.decode("ascii")
+    limits.check_frames(data_string)
     (replay_data, _seed) = _Unpacker.parse_replay_data(data_string, mode)
     return replay_data
+
+
+def _parse_payloads(payloads, *, decoded, decompressed, mode, columnar,
+    limits):
+    import binascii
+
+    limits = limits or _NO_LIMITS
+    results = []
+    for data in payloads:
+        if not decoded and not decompressed:
+            # unlike `base64.b64decode`, this doesn't make an intermediate
+            # copy of str payloads.
+            data = binascii.a2b_base64(data)
+        if not decompressed:
+            data = limits.decompress(data)
+        limits.check_frames(data)
+
+        if columnar:
+            # parse the decompressed bytes directly, without decoding them to
+            # a str first
+            (replay_data, _seed) = FrameColumns.from_string(data, mode)
+        else:
+            if isinstance(data, bytes):
+                data = data.decode("ascii")
+            (replay_data, _seed) = _Unpacker.parse_replay_data(data, mode)
+        results.append(replay_data)
+    return results
+
+
+def parse_replay_data_many(payloads, *, decoded=False, decompressed=False,
+    mode=GameMode.STD, workers=1, columnar=True, limits=None):
+    """
+    Parses the replay data portion of many replays. This is the bulk version
+    of :func:`parse_replay_data`.
+
+    Parameters
+    ----------
+    payloads: Iterable[str or bytes]
+        The replay data to parse. This may be an arbitrarily long iterator,
+        as payloads are consumed lazily.
+    decoded: bool
+        Whether ``payloads`` have already been decoded from a b64
+        representation. See :func:`parse_replay_data`.
+    decompressed: bool
+        Whether ``payloads`` have already been both decompressed from lzma,
+        and decoded to ascii. See :func:`parse_replay_data`.
+    mode: GameMode
+        What mode to parse the replay data as.
+    workers: int
+        The number of worker processes to parse with. Each worker decodes,
+        decompresses, and parses a batch of payloads at a time.
+    columnar: bool
+        Whether to return each replay data as a
+        :class:`~osrparse.columns.FrameColumns` (which is much cheaper to
+        create and to send between processes) instead of a list of
+        :class:`~osrparse.utils.ReplayEvent`.
+    limits: Optional[DecodeLimits]
+        The limits to enforce while parsing each payload, or ``None`` for no
+        limits.
+
+    Returns
+    -------
+    Iterator[FrameColumns] or Iterator[List[ReplayEvent]]
+        The parsed replay data of each payload, in the order of ``payloads``.
+    """
+    from functools import partial
+
+    parse = partial(_parse_payloads, decoded=decoded,
+        decompressed=decompressed, mode=mode, columnar=columnar,
+        limits=limits)
+    batches = _batches(payloads, _PAYLOAD_BATCH_SIZE)
+    for results in _imap(parse, batches, workers):
+        yield from results
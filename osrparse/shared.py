@@ -0,0 +1,184 @@
+import os
+import weakref
+from dataclasses import fields
+from multiprocessing import shared_memory
+
+from osrparse.columns import FrameColumns
+from osrparse.replay import Replay, _Unpacker
+
+# the order columns are laid out in a shared memory block. The 8 byte columns
+# come first so every column is aligned to its item size.
+_LAYOUT = [("x", "d", 8), ("y", "d", 8), ("time_delta", "i", 4),
+    ("keys", "i", 4)]
+_FRAME_SIZE = sum(size for (_name, _typecode, size) in _LAYOUT)
+
+
+def _release(shm, views):
+    # unlink first, so the block is always freed once every mapping of it is
+    # gone, even if we can't close our own mapping below.
+    shm.unlink()
+    for view in views:
+        view.release()
+    try:
+        shm.close()
+    except BufferError:
+        # the caller still holds a slice of a column, which keeps the mapping
+        # alive. Hand the mapping over to the slice, which unmaps it once it
+        # is garbage collected, and close everything else. Otherwise
+        # `SharedMemory.__del__` would try (and fail) to close it again.
+        shm._mmap = None
+        shm.close()
+
+
+def _untrack(shm):
+    # gives up ownership of a shared memory block this process created. By
+    # default, the resource tracker of the creating process unlinks the block
+    # once that process exits, which for a pool worker may well be before the
+    # parent has attached it. Only posix shared memory is tracked.
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+
+class SharedReplay:
+    """
+    A handle to a replay whose replay data lives in a
+    ``multiprocessing.shared_memory`` block.
+
+    A ``SharedReplay`` is created in a worker process with
+    :meth:`from_path` or :meth:`from_string`, and is cheap to pickle: only the
+    header fields and the name of the shared memory block are sent back to the
+    parent process. The parent then calls :meth:`attach` to map the replay
+    data without copying it.
+
+    Attributes
+    ----------
+    header: dict
+        The attributes of the replay, except ``replay_data``.
+    name: str
+        The name of the shared memory block holding the replay data.
+    frames: int
+        The number of frames in the replay data.
+
+    Notes
+    -----
+    The process which creates the handle gives up ownership of the shared
+    memory block, so the block outlives it (eg after a process pool has shut
+    down). The block is then owned by whoever calls :meth:`attach` (or
+    :meth:`discard`). It is freed once the ``Replay`` returned by
+    :meth:`attach`, and every reference to its ``replay_data``, have been
+    garbage collected. A handle should be attached or discarded exactly once,
+    or the block will leak until the interpreter exits.
+    """
+    def __init__(self, header, name, frames):
+        self.header = header
+        self.name = name
+        self.frames = frames
+
+    @staticmethod
+    def from_path(path):
+        """
+        Parses the ``.osr`` file at the given ``path`` into shared memory.
+
+        Parameters
+        ----------
+        path: str or os.PathLike
+            The path to the osr file to read from.
+
+        Returns
+        -------
+        SharedReplay
+            A handle to the parsed replay.
+        """
+        with open(path, "rb") as f:
+            return SharedReplay.from_string(f.read())
+
+    @staticmethod
+    def from_string(data):
+        """
+        Parses a string containing ``.osr`` data into shared memory.
+
+        Parameters
+        ----------
+        data: bytes
+            The data to parse.
+
+        Returns
+        -------
+        SharedReplay
+            A handle to the parsed replay.
+        """
+        replay = _Unpacker(data, columnar=True).unpack()
+        columns = replay.replay_data
+        n = len(columns)
+
+        # a shared memory block can't have a size of 0
+        shm = shared_memory.SharedMemory(create=True,
+            size=max(n * _FRAME_SIZE, 1))
+        try:
+            offset = 0
+            for (name, _typecode, size) in _LAYOUT:
+                column = getattr(columns, name).tobytes()
+                shm.buf[offset:offset + n * size] = column
+                offset += n * size
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        shm.close()
+        _untrack(shm)
+
+        # the original play data is left behind, as sending it to the parent
+        # would defeat the purpose of shared memory
+        header = {f.name: getattr(replay, f.name) for f in fields(Replay)
+            if f.name != "replay_data"}
+        return SharedReplay(header, shm.name, n)
+
+    def attach(self):
+        """
+        Maps the replay data of this handle and returns the full replay.
+
+        Returns
+        -------
+        Replay
+            The replay. Its ``replay_data`` is a
+            :class:`~osrparse.columns.FrameColumns` whose columns are views
+            into the shared memory block.
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        n = self.frames
+        views = []
+        offset = 0
+        for (_name, typecode, size) in _LAYOUT:
+            view = shm.buf[offset:offset + n * size].cast(typecode)
+            views.append(view)
+            offset += n * size
+
+        (x, y, time_delta, keys) = views
+        columns = FrameColumns(self.header["mode"], time_delta, x, y, keys)
+        weakref.finalize(columns, _release, shm, views)
+        return Replay(replay_data=columns, **self.header)
+
+    def discard(self):
+        """
+        Frees the shared memory block of this handle without attaching it.
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        shm.close()
+        shm.unlink()
+
+
+def parse_shared(path):
+    """
+    Parses the ``.osr`` file at the given ``path`` into shared memory. This is
+    a top level alias of :meth:`SharedReplay.from_path`, suitable for passing
+    to ``Pool.map`` and friends.
+
+    Examples
+    --------
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> with ProcessPoolExecutor() as executor:
+    ...     handles = executor.map(parse_shared, paths)
+    ...     replays = [handle.attach() for handle in handles]
+    """
+    return SharedReplay.from_path(path)
@@ -0,0 +1,173 @@
+"""
+Deterministic generation of synthetic replays, for benchmarks and stress
+tests which need replays of arbitrary size.
+
+>>> from osrparse import GameMode
+>>> from osrparse.synth import generate, generate_bytes
+>>> replay = generate(GameMode.STD, frames=1_000_000, seed=1, columnar=True)
+>>> data = generate_bytes(GameMode.MANIA, frames=10_000, seed=2)
+"""
+import hashlib
+import random
+import struct
+from array import array
+from datetime import datetime, timezone, timedelta
+
+from osrparse.columns import FrameColumns
+from osrparse.replay import Replay
+from osrparse.utils import GameMode, Mod, LifeBarState
+
+# the x positions taiko frames use, depending on which keys are pressed
+_TAIKO_X = [0, 320, 640]
+# the probability of a frame having a zero or negative time delta, after the
+# first two frames
+_ZERO_DELTA = 0.01
+_NEGATIVE_DELTA = 0.001
+
+
+def _hash(rng):
+    return hashlib.md5(rng.getrandbits(64).to_bytes(8, "little")).hexdigest()
+
+
+def _time_deltas(rng, frames):
+    # real replays start with a frame at time 0 and a frame with a delta of
+    # -1, before the first frame which actually moves time forward.
+    time_delta = [0, -1][:frames]
+    random_ = rng.random
+    randint = rng.randint
+    for _ in range(frames - len(time_delta)):
+        r = random_()
+        if r < _NEGATIVE_DELTA:
+            time_delta.append(-randint(1, 16))
+        elif r < _NEGATIVE_DELTA + _ZERO_DELTA:
+            time_delta.append(0)
+        else:
+            time_delta.append(randint(1, 33))
+    return array("i", time_delta)
+
+
+def _frames(mode, rng, frames, keys):
+    time_delta = _time_deltas(rng, frames)
+    uniform = rng.uniform
+    getrandbits = rng.getrandbits
+    zeros = array("d", bytes(8 * frames))
+    x = zeros
+    y = zeros
+
+    if mode is GameMode.STD:
+        # osu! stores positions as 32 bit floats, so real replays never have
+        # more than a handful of decimals
+        x = array("d", [round(uniform(-50, 562), 4) for _ in range(frames)])
+        y = array("d", [round(uniform(-50, 434), 4) for _ in range(frames)])
+        key_values = array("i", [getrandbits(5) for _ in range(frames)])
+    elif mode is GameMode.TAIKO:
+        x = array("d", [rng.choice(_TAIKO_X) for _ in range(frames)])
+        key_values = array("i", [getrandbits(4) for _ in range(frames)])
+    elif mode is GameMode.CTB:
+        x = array("d", [round(uniform(0, 512), 4) for _ in range(frames)])
+        key_values = array("i", [getrandbits(1) for _ in range(frames)])
+    elif mode is GameMode.MANIA:
+        key_values = array("i", [getrandbits(keys) for _ in range(frames)])
+
+    return FrameColumns(mode, time_delta, x, y, key_values)
+
+
+def generate(mode, *, frames=1000, seed=0, rng_seed=True, life_bar=None,
+    keys=18, columnar=False):
+    """
+    Generates a valid, synthetic replay.
+
+    The same arguments always generate the same replay.
+
+    Parameters
+    ----------
+    mode: GameMode
+        The game mode of the replay.
+    frames: int
+        The number of frames in the replay data. Like real replays, the first
+        two frames have time deltas of ``0`` and ``-1``, and a small number
+        of the remaining frames have zero or negative time deltas.
+    seed: int
+        The seed to generate the replay from.
+    rng_seed: bool
+        Whether the replay has an rng seed (stored as a final frame in the
+        replay data).
+    life_bar: Optional[int]
+        The number of life bar states. If ``None``, there is one state every
+        two seconds of the replay, like osu! does.
+    keys: int
+        For osu!mania, how many keys (up to 18) may be pressed.
+    columnar: bool
+        Whether to keep the replay data as a (read only)
+        :class:`~osrparse.columns.FrameColumns` instead of a list of replay
+        events. Creating the events takes most of the time for very long
+        replays.
+
+    Returns
+    -------
+    Replay
+        The generated replay.
+    """
+    rng = random.Random(seed)
+    replay_data = _frames(mode, rng, frames, keys)
+
+    duration = max(sum(replay_data.time_delta), 0)
+    if life_bar is None:
+        life_bar = duration // 2000
+    life_bar_graph = [LifeBarState(i * 2000, round(rng.random(), 2))
+        for i in range(life_bar)] or None
+
+    counts = [rng.randrange(1 << 15) for _ in range(6)]
+    mods = Mod(rng.choice([0, Mod.Hidden, Mod.HardRock, Mod.DoubleTime,
+        Mod.Hidden | Mod.HardRock]))
+    # whole seconds, since `Replay.pack` doesn't keep sub-second precision
+    timestamp = datetime(2007, 9, 16, tzinfo=timezone.utc) + timedelta(
+        seconds=rng.randrange(20 * 365 * 24 * 60 * 60))
+
+    return Replay(
+        mode=mode,
+        game_version=rng.randrange(20070916, 20261231),
+        beatmap_hash=_hash(rng),
+        username=f"synth{seed}",
+        replay_hash=_hash(rng),
+        count_300=counts[0],
+        count_100=counts[1],
+        count_50=counts[2],
+        count_geki=counts[3],
+        count_katu=counts[4],
+        count_miss=counts[5],
+        score=rng.randrange(1 << 31),
+        max_combo=rng.randrange(1 << 15),
+        perfect=rng.random() < 0.5,
+        mods=mods,
+        life_bar_graph=life_bar_graph,
+        timestamp=timestamp,
+        replay_data=replay_data if columnar else replay_data.to_events(),
+        replay_id=rng.randrange(1 << 31),
+        rng_seed=rng.randrange(1, 1 << 31) if rng_seed else None
+    )
+
+
+def generate_bytes(mode, *, old_replay_id=False, **kwargs):
+    """
+    Generates the ``.osr`` data of a valid, synthetic replay. Takes the same
+    arguments as :func:`generate`, and returns the same replay, packed.
+
+    Parameters
+    ----------
+    old_replay_id: bool
+        Whether to store the replay id as 4 bytes, as old replays did,
+        instead of 8 bytes.
+
+    Returns
+    -------
+    bytes
+        The ``.osr`` data of the replay.
+    """
+    # packing columns is much faster than packing events
+    kwargs["columnar"] = True
+    replay = generate(mode, **kwargs)
+    data = replay.pack()
+    if old_replay_id:
+        data = data[:-8] + struct.pack("<i", replay.replay_id)
+    return data
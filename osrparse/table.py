@@ -0,0 +1,341 @@
+import struct
+from array import array
+
+from osrparse.replay import _Unpacker, Replay
+from osrparse.utils import _imap, _batches
+
+# how many bytes to read from the start of a file when parsing its header.
+# Long life bar strings may need more, in which case we read the whole file.
+_HEAD_SIZE = 1 << 13
+# how many files each worker process parses at a time in
+# `HeaderTable.from_paths`.
+_BATCH_SIZE = 256
+
+# the numeric columns of a `HeaderTable` and their typecodes, in the order
+# they are stored in a replay.
+NUMERIC_COLUMNS = {
+    "mode": "b",
+    "game_version": "i",
+    "count_300": "h",
+    "count_100": "h",
+    "count_50": "h",
+    "count_geki": "h",
+    "count_katu": "h",
+    "count_miss": "h",
+    "score": "i",
+    "max_combo": "h",
+    "perfect": "b",
+    "mods": "i",
+    "timestamp": "q",
+    "replay_id": "q"
+}
+# the order of the values in a row, as sent back from worker processes.
+_ROW = ["mode", "game_version", "beatmap_hash", "username", "replay_hash",
+    "count_300", "count_100", "count_50", "count_geki", "count_katu",
+    "count_miss", "score", "max_combo", "perfect", "mods", "timestamp",
+    "replay_id", "path"]
+# the string columns of a `HeaderTable`. Beatmap hashes and usernames repeat
+# often across a corpus, so they are interned.
+INTERNED_COLUMNS = ["beatmap_hash", "username"]
+
+
+class StringColumn:
+    """
+    A column of interned strings. Each row stores an index (``code``) into a
+    list of unique ``values``.
+
+    Attributes
+    ----------
+    codes: array
+        The index into ``values`` of each row.
+    values: List[str]
+        The unique strings of this column, in order of first appearance.
+    """
+    def __init__(self, codes=None, values=None):
+        self.codes = codes if codes is not None else array("i")
+        self.values = values if values is not None else []
+        self._index = {value: i for i, value in enumerate(self.values)}
+
+    def append(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = len(self.values)
+            self._index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def code(self, value):
+        """
+        Returns the code of ``value``, or ``-1`` if it is not in this column.
+        """
+        return self._index.get(value, -1)
+
+    def take(self, rows):
+        # the values (and so codes) are kept as they are, even if some no
+        # longer appear in the selected rows.
+        codes = self.codes
+        return StringColumn(array("i", [codes[i] for i in rows]),
+            self.values)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+
+def _unpack_row(data):
+    # unpacks the header of a replay into a row of a `HeaderTable`, without
+    # the replay id and path. Returns the row, and the offset of the replay
+    # id.
+    unpacker = _Unpacker(data)
+    header = unpacker.unpack_fields(raw=True)
+    unpacker.skip_play_data()
+    return ([header[name] for name in _ROW[:-2]], unpacker.offset)
+
+
+def _read_row(path):
+    # reads only the header and the replay id of the replay at `path`, and
+    # not its (much larger) compressed play data.
+    with open(path, "rb") as f:
+        data = f.read(_HEAD_SIZE)
+        try:
+            (row, offset) = _unpack_row(data)
+        except (IndexError, ValueError, struct.error):
+            # the header didn't fit. Read the rest of the file and try again,
+            # raising any errors this time.
+            data += f.read()
+            (row, offset) = _unpack_row(data)
+        f.seek(offset)
+        tail = f.read()
+
+    row.append(_Unpacker(tail).unpack_replay_id())
+    row.append(str(path))
+    return row
+
+
+def _read_rows(paths):
+    return [_read_row(path) for path in paths]
+
+
+def _string_row(data):
+    (row, offset) = _unpack_row(data)
+    unpacker = _Unpacker(data)
+    unpacker.offset = offset
+    row.append(unpacker.unpack_replay_id())
+    row.append(None)
+    return row
+
+
+def _string_rows(datas):
+    return [_string_row(data) for data in datas]
+
+
+class HeaderTable:
+    """
+    The headers of many replays, stored as one typed array per attribute.
+
+    Create one with :meth:`from_paths`. Each attribute of a replay header is
+    available as a column of the same name: ``mode``, ``game_version``,
+    ``count_300`` through ``count_miss``, ``score``, ``max_combo``,
+    ``perfect``, ``mods`` (as an int bitmask), ``timestamp`` (in windows
+    ticks), and ``replay_id`` are ``array.array`` s, ``beatmap_hash`` and
+    ``username`` are :class:`StringColumn` s, and ``replay_hash`` and
+    ``path`` are lists of strings.
+
+    Methods which select rows return an ``array`` of row indices, which can be
+    passed to :meth:`select` to create a smaller table, or to :meth:`load` to
+    parse the full replays of those rows.
+    """
+    def __init__(self, columns):
+        for (name, column) in columns.items():
+            setattr(self, name, column)
+
+    @staticmethod
+    def from_paths(paths, *, workers=1):
+        """
+        Creates a new ``HeaderTable`` from the ``.osr`` files at ``paths``.
+        Only the headers of the files are read.
+
+        Parameters
+        ----------
+        paths: Iterable[str or os.PathLike]
+            The paths to the osr files to read from.
+        workers: int
+            The number of worker processes to parse headers with.
+
+        Returns
+        -------
+        HeaderTable
+            The table of the headers.
+        """
+        batches = _batches(paths, _BATCH_SIZE)
+        return HeaderTable._from_rows(_imap(_read_rows, batches, workers))
+
+    @staticmethod
+    def from_strings(datas, *, workers=1):
+        """
+        Creates a new ``HeaderTable`` from many strings containing ``.osr``
+        data, eg replays downloaded from the osu! api. The play data of each
+        replay is skipped over without being decompressed.
+
+        Parameters
+        ----------
+        datas: Iterable[bytes]
+            The data of each replay.
+        workers: int
+            The number of worker processes to parse headers with.
+
+        Returns
+        -------
+        HeaderTable
+            The table of the headers. Its ``path`` column is ``None`` for
+            every row, so :meth:`load` can't be used with it.
+        """
+        batches = _batches(datas, _BATCH_SIZE)
+        return HeaderTable._from_rows(_imap(_string_rows, batches, workers))
+
+    @staticmethod
+    def _from_rows(batches):
+        columns = {name: array(typecode) for (name, typecode) in
+            NUMERIC_COLUMNS.items()}
+        columns.update((name, StringColumn()) for name in INTERNED_COLUMNS)
+        columns["replay_hash"] = []
+        columns["path"] = []
+
+        appends = [columns[name].append for name in _ROW]
+
+        for rows in batches:
+            for row in rows:
+                for (append, value) in zip(appends, row):
+                    append(value)
+
+        return HeaderTable(columns)
+
+    def _columns(self):
+        names = (list(NUMERIC_COLUMNS) + INTERNED_COLUMNS +
+            ["replay_hash", "path"])
+        return {name: getattr(self, name) for name in names}
+
+    def __len__(self):
+        return len(self.path)
+
+    def row(self, i):
+        """
+        Returns the header of row ``i`` as a dict, keyed by attribute name.
+        """
+        return {name: column[i] for (name, column) in self._columns().items()}
+
+    def select(self, rows):
+        """
+        Creates a new ``HeaderTable`` containing only ``rows``.
+
+        Parameters
+        ----------
+        rows: Iterable[int]
+            The indices of the rows to keep, as returned by eg
+            :meth:`mods_all`.
+
+        Returns
+        -------
+        HeaderTable
+            The selected rows.
+        """
+        # every column is indexed by `rows`, so it can't be a one shot iterator
+        rows = list(rows)
+        columns = {}
+        for (name, column) in self._columns().items():
+            if isinstance(column, StringColumn):
+                columns[name] = column.take(rows)
+            elif isinstance(column, array):
+                columns[name] = array(column.typecode,
+                    [column[i] for i in rows])
+            else:
+                columns[name] = [column[i] for i in rows]
+        return HeaderTable(columns)
+
+    def mods_all(self, mods):
+        """
+        Returns the indices of the rows played with (at least) every mod in
+        ``mods``.
+
+        Parameters
+        ----------
+        mods: Mod or int
+            The mods to check for.
+
+        Returns
+        -------
+        array
+            The indices of the matching rows.
+
+        Notes
+        -----
+        This (like :meth:`mods_any` and :meth:`mods_none`) checks one row at a
+        time in plain python. It is not vectorized, but avoids creating a
+        ``Mod`` per row.
+        """
+        mods = int(mods)
+        return array("q", [i for (i, m) in enumerate(self.mods)
+            if m & mods == mods])
+
+    def mods_any(self, mods):
+        """
+        Returns the indices of the rows played with any of the mods in
+        ``mods``.
+        """
+        mods = int(mods)
+        return array("q", [i for (i, m) in enumerate(self.mods) if m & mods])
+
+    def mods_none(self, mods):
+        """
+        Returns the indices of the rows played with none of the mods in
+        ``mods``.
+        """
+        mods = int(mods)
+        return array("q", [i for (i, m) in enumerate(self.mods)
+            if not m & mods])
+
+    def group_by_beatmap(self):
+        """
+        Groups rows by their ``beatmap_hash``.
+
+        Returns
+        -------
+        Dict[str, array]
+            The indices of the rows played on each beatmap.
+
+        Examples
+        --------
+        >>> groups = table.group_by_beatmap()
+        >>> best = {beatmap_hash: max(table.score[i] for i in rows)
+        ...     for (beatmap_hash, rows) in groups.items()}
+        """
+        groups = [array("q") for _ in self.beatmap_hash.values]
+        for (i, code) in enumerate(self.beatmap_hash.codes):
+            groups[code].append(i)
+        return {value: rows for (value, rows) in
+            zip(self.beatmap_hash.values, groups) if rows}
+
+    def load(self, rows=None, *, workers=1):
+        """
+        Parses the full replays of ``rows``.
+
+        Parameters
+        ----------
+        rows: Iterable[int]
+            The indices of the rows to load, or ``None`` to load every row.
+        workers: int
+            The number of worker processes to parse replays with.
+
+        Returns
+        -------
+        Iterator[Replay]
+            The replays of ``rows``, in order. They are parsed lazily.
+        """
+        paths = self.path if rows is None else [self.path[i] for i in rows]
+        return _imap(Replay.from_path, paths, workers)
@@ -0,0 +1,308 @@
+"""
+Bulk transforms of replay data, for data augmentation and moderation.
+
+Every transform is a :class:`Transform`. Transforms are composed with
+:func:`compose` (or :meth:`Transform.then`) into a single ``Transform``,
+which is applied to a replay in one pass over its frame columns, no matter how
+many transforms it was composed from:
+
+>>> from osrparse.transforms import compose, flip_y, trim, speed
+>>> transform = compose(flip_y(), trim(10_000, 60_000), speed(1.5))
+>>> augmented = transform(replay)
+"""
+import math
+from dataclasses import dataclass, replace
+from array import array
+from itertools import accumulate, compress
+from pathlib import Path
+
+from osrparse.columns import FrameColumns
+from osrparse.replay import _Unpacker
+from osrparse.utils import GameMode, Mod, LifeBarState, _imap
+
+# the size of the osu! playfield, in osu!pixels
+PLAYFIELD_WIDTH = 512
+PLAYFIELD_HEIGHT = 384
+
+# the speed of each speed changing mod
+_RATES = {Mod.DoubleTime: 1.5, Mod.HalfTime: 0.75}
+_SPEED_MODS = Mod.DoubleTime | Mod.Nightcore | Mod.HalfTime
+
+
+def _rate(mods):
+    if mods & Mod.DoubleTime:
+        return _RATES[Mod.DoubleTime]
+    if mods & Mod.HalfTime:
+        return _RATES[Mod.HalfTime]
+    return 1.0
+
+
+def _mods_for_rate(mods, rate):
+    if math.isclose(rate, 1):
+        return mods & ~_SPEED_MODS
+    for (mod, mod_rate) in _RATES.items():
+        if not math.isclose(rate, mod_rate):
+            continue
+        new_mods = (mods & ~_SPEED_MODS) | mod
+        # keep nightcore if we are still double time
+        if mod is Mod.DoubleTime:
+            new_mods |= mods & Mod.Nightcore
+        return new_mods
+    raise ValueError(f"No mod plays at a speed of {rate}")
+
+
+@dataclass(frozen=True)
+class Transform:
+    """
+    An affine transform of the positions and times of the frames of a replay,
+    plus a window of time to keep.
+
+    Positions are transformed as ``x * x_scale + x_offset`` (and likewise for
+    ``y``), and the absolute time of each frame and life bar state as
+    ``t * time_scale + time_offset``. Only frames and life bar states whose
+    (original) absolute time is within ``[start, end)`` are kept.
+
+    You likely want to create transforms with :func:`mirror_x`,
+    :func:`flip_y`, :func:`shift`, :func:`trim`, and :func:`speed` instead of
+    directly.
+
+    Attributes
+    ----------
+    x_scale: float
+    x_offset: float
+    y_scale: float
+    y_offset: float
+    time_scale: float
+    time_offset: float
+    start: float
+        The start of the window of original time to keep, inclusive.
+    end: float
+        The end of the window of original time to keep, exclusive.
+    rate: float
+        The factor this transform changes the speed of the replay by. Used to
+        update the speed changing mods of the replay, if ``update_mods``.
+    update_mods: bool
+        Whether to update the mods of the replay to match its new speed.
+    """
+    x_scale: float = 1.0
+    x_offset: float = 0.0
+    y_scale: float = 1.0
+    y_offset: float = 0.0
+    time_scale: float = 1.0
+    time_offset: float = 0.0
+    start: float = -math.inf
+    end: float = math.inf
+    rate: float = 1.0
+    update_mods: bool = False
+
+    def then(self, other):
+        """
+        Returns the transform which applies this transform, and then
+        ``other``.
+        """
+        # a window of `other` is in the time after this transform, so map it
+        # back to original time
+        start = (other.start - self.time_offset) / self.time_scale
+        end = (other.end - self.time_offset) / self.time_scale
+        if start > end:
+            (start, end) = (end, start)
+
+        return Transform(
+            x_scale=self.x_scale * other.x_scale,
+            x_offset=self.x_offset * other.x_scale + other.x_offset,
+            y_scale=self.y_scale * other.y_scale,
+            y_offset=self.y_offset * other.y_scale + other.y_offset,
+            time_scale=self.time_scale * other.time_scale,
+            time_offset=self.time_offset * other.time_scale +
+                other.time_offset,
+            start=max(self.start, start),
+            end=min(self.end, end),
+            rate=self.rate * other.rate,
+            update_mods=self.update_mods or other.update_mods
+        )
+
+    def apply(self, replay, *, columnar=False):
+        """
+        Applies this transform to ``replay``.
+
+        Parameters
+        ----------
+        replay: Replay
+            The replay to transform. It is not modified.
+        columnar: bool
+            Whether to return the replay data as a (read only)
+            :class:`~osrparse.columns.FrameColumns` instead of a list of
+            replay events. This is much faster if the transformed replay is
+            only going to be written or analyzed.
+
+        Returns
+        -------
+        Replay
+            A copy of ``replay`` with transformed replay data and, if
+            ``update_mods``, updated mods.
+
+        Raises
+        ------
+        ValueError
+            If this transform changes positions, and ``replay`` is an
+            osu!taiko or osu!mania replay, whose frames don't have positions.
+            Or if ``update_mods`` and no mod plays at the resulting speed.
+        """
+        mode = replay.mode
+        moves_x = (self.x_scale, self.x_offset) != (1, 0)
+        moves_y = (self.y_scale, self.y_offset) != (1, 0)
+        if (moves_x or moves_y) and mode in [GameMode.TAIKO, GameMode.MANIA]:
+            raise ValueError(f"Cannot transform positions of a {mode} replay")
+
+        mods = replay.mods
+        if self.update_mods:
+            mods = _mods_for_rate(mods, _rate(mods) * self.rate)
+
+        frames = FrameColumns.from_events(replay.replay_data, mode)
+        times = list(accumulate(frames.time_delta))
+        start = self.start
+        end = self.end
+        keep = [start <= t < end for t in times]
+        trimmed = not all(keep)
+
+        def select(column):
+            if trimmed:
+                return list(compress(column, keep))
+            return column
+
+        # round absolute times rather than deltas, so rounding errors don't
+        # add up over the replay
+        a = self.time_scale
+        b = self.time_offset
+        times = [round(t * a + b) for t in select(times)]
+        time_delta = array("i", [t - t_prev for (t_prev, t) in
+            zip([0] + times, times)])
+
+        x = select(frames.x)
+        if moves_x and mode in [GameMode.STD, GameMode.CTB]:
+            (a, b) = (self.x_scale, self.x_offset)
+            x = [v * a + b for v in x]
+        y = select(frames.y)
+        if moves_y and mode is GameMode.STD:
+            (a, b) = (self.y_scale, self.y_offset)
+            y = [v * a + b for v in y]
+        keys = select(frames.keys)
+
+        frames = FrameColumns(mode, time_delta, array("d", x), array("d", y),
+            array("i", keys))
+        if not columnar:
+            frames = frames.to_events()
+
+        # life bar states are on the same timeline as the frames
+        life_bar_graph = replay.life_bar_graph
+        if life_bar_graph is not None:
+            (a, b) = (self.time_scale, self.time_offset)
+            life_bar_graph = [LifeBarState(round(state.time * a + b),
+                state.life) for state in life_bar_graph
+                if start <= state.time < end]
+            # parsed replays without a life bar have a life_bar_graph of None
+            life_bar_graph = life_bar_graph or None
+
+        return replace(replay, replay_data=frames, mods=mods,
+            life_bar_graph=life_bar_graph)
+
+    __call__ = apply
+
+
+def compose(*transforms):
+    """
+    Composes ``transforms`` into a single transform, which applies each of
+    ``transforms`` in order.
+    """
+    transform = Transform()
+    for other in transforms:
+        transform = transform.then(other)
+    return transform
+
+
+def mirror_x():
+    """
+    Mirrors the replay horizontally, as the ``Mirror`` mod does.
+    """
+    return Transform(x_scale=-1.0, x_offset=PLAYFIELD_WIDTH)
+
+
+def flip_y():
+    """
+    Flips the replay vertically, as the ``HardRock`` mod does.
+    """
+    return Transform(y_scale=-1.0, y_offset=PLAYFIELD_HEIGHT)
+
+
+def shift(offset):
+    """
+    Shifts every frame of the replay by ``offset`` ms.
+    """
+    return Transform(time_offset=offset)
+
+
+def trim(start, end):
+    """
+    Keeps only the frames of the replay at or after ``start`` ms, and before
+    ``end`` ms.
+    """
+    return Transform(start=start, end=end)
+
+
+def speed(rate, *, update_mods=True):
+    """
+    Speeds the replay up by a factor of ``rate``. Times are divided by
+    ``rate``, so a ``rate`` of ``1.5`` makes the replay play as fast as the
+    ``DoubleTime`` mod would.
+
+    Parameters
+    ----------
+    rate: float
+        The factor to speed the replay up by.
+    update_mods: bool
+        Whether to update the mods of the replay to match its new speed. For
+        instance, speeding up a nomod replay by ``1.5`` adds ``DoubleTime``,
+        and slowing a ``DoubleTime`` replay down by ``1.5`` removes it.
+    """
+    return Transform(time_scale=1 / rate, rate=rate, update_mods=update_mods)
+
+
+def _write_variants(args):
+    (path, variants, directory) = args
+    with open(path, "rb") as f:
+        replay = _Unpacker(f.read(), columnar=True).unpack()
+
+    outputs = []
+    for (name, transform) in variants.items():
+        output = Path(directory) / f"{Path(path).stem}.{name}.osr"
+        transform(replay, columnar=True).write_path(output)
+        outputs.append(output)
+    return outputs
+
+
+def write_variants(paths, variants, directory, *, workers=1):
+    """
+    Writes transformed variants of many replays.
+
+    Each replay is parsed once, and every variant of it is written to
+    ``directory`` as ``<name of replay>.<name of variant>.osr``.
+
+    Parameters
+    ----------
+    paths: Iterable[str or os.PathLike]
+        The paths to the replays to transform.
+    variants: Dict[str, Transform]
+        The transform of each variant, keyed by the name of the variant.
+    directory: str or os.PathLike
+        The directory to write the variants to.
+    workers: int
+        The number of worker processes to use.
+
+    Returns
+    -------
+    Iterator[List[Path]]
+        The paths of the written variants of each replay, in the order of
+        ``paths``.
+    """
+    args = ((path, variants, directory) for path in paths)
+    return _imap(_write_variants, args, workers)
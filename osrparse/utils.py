@@ -1,5 +1,7 @@
 from enum import Enum, IntFlag
 from dataclasses import dataclass
+from collections import deque
+from itertools import islice
 
 class GameMode(Enum):
     """
@@ -193,3 +195,32 @@ class LifeBarState:
     """
     time: int
     life: float
+
+def _imap(function, iterable, jobs):
+    """
+    Like ``map``, but runs ``function`` in ``jobs`` worker processes when
+    ``jobs > 1``. Results are yielded in order, and only a bounded number of
+    items are consumed from ``iterable`` ahead of the results, so arbitrarily
+    large inputs are streamed.
+    """
+    if jobs <= 1:
+        yield from map(function, iterable)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for item in iterable:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= jobs * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _batches(iterable, size):
+    iterable = iter(iterable)
+    batch = list(islice(iterable, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterable, size))
@@ -0,0 +1,254 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import wait
+from fnmatch import fnmatch
+from pathlib import Path
+
+# directory modification times are only so precise. If the directory changed
+# more recently than this many seconds ago, another file may have been added
+# within the same tick after we scanned it, so we scan it again next time.
+_MTIME_MARGIN = 2
+
+_log = logging.getLogger(__name__)
+
+
+class ReplayWatcher:
+    """
+    Watches a directory (such as osu!'s ``Replays`` folder) for new and
+    changed replays, by polling.
+
+    Each call to :meth:`poll` returns the replays which were added or changed
+    since they were last returned, once they have finished being written.
+    Once a replay has been handled, pass it to :meth:`ack`. Which replays
+    have been acknowledged is saved to ``state_path``, so a new watcher on the
+    same directory picks up where the last one left off, and returns any
+    replays which were returned but never acknowledged again. That is,
+    replays are delivered at least once.
+
+    Polling is cheap: the directory is only listed when its modification
+    time changes, and then only replays which weren't seen before are
+    checked. Every ``rescan_interval`` seconds, every replay is checked, to
+    catch replays overwritten in place. Replays still being written are
+    checked on every poll. Replays are never read by the watcher.
+
+    Parameters
+    ----------
+    directory: str or os.PathLike
+        The directory to watch. Subdirectories are not watched.
+    state_path: Optional[str or os.PathLike]
+        The file to save the state of the watcher to. If ``None``, the state
+        is only kept in memory.
+    pattern: str
+        Only files whose names match this glob pattern are watched.
+    settle: float
+        How long, in seconds, the size and modification time of a file must
+        stay the same before it is considered fully written.
+    rescan_interval: float
+        How often, in seconds, to list the directory even if its modification
+        time didn't change.
+    """
+    def __init__(self, directory, *, state_path=None, pattern="*.osr",
+        settle=1.0, rescan_interval=60.0):
+        self.directory = Path(directory)
+        self.state_path = Path(state_path) if state_path else None
+        self.pattern = pattern
+        self.settle = settle
+        self.rescan_interval = rescan_interval
+
+        # name -> (size, mtime) of replays which have been acknowledged
+        self.seen = {}
+        # name -> (size, mtime) of replays which have been returned, but not
+        # yet acknowledged
+        self.delivered = {}
+        # name -> ((size, mtime), when we first saw that size and mtime) of
+        # replays which are new or changed, but may still be being written
+        self.pending = {}
+        self._dir_mtime = None
+        self._last_scan = None
+
+        if self.state_path and self.state_path.exists():
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self.seen = {name: tuple(key) for (name, key) in
+                state["files"].items()}
+
+    def _save(self):
+        if not self.state_path:
+            return
+        state = {"directory": str(self.directory), "files": self.seen}
+        # write to a temporary file first, so a crash never leaves a
+        # half-written state file
+        temp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    def _needs_scan(self, now):
+        # returns None if no scan is needed, and otherwise whether every
+        # replay should be checked for changes (a full scan), or only new ones
+        if self._last_scan is None:
+            return True
+        if now - self._last_scan >= self.rescan_interval:
+            return True
+        dir_mtime = os.stat(self.directory).st_mtime_ns
+        if dir_mtime != self._dir_mtime:
+            return False
+        if time.time() - dir_mtime / 1e9 < _MTIME_MARGIN:
+            return False
+        return None
+
+    def _scan(self, now, full):
+        self._dir_mtime = os.stat(self.directory).st_mtime_ns
+        if full:
+            self._last_scan = now
+        names = set()
+        for entry in os.scandir(self.directory):
+            if not fnmatch(entry.name, self.pattern) or not entry.is_file():
+                continue
+            names.add(entry.name)
+            if entry.name in self.pending or entry.name in self.delivered:
+                continue
+            # adding a replay changes the modification time of the directory,
+            # but overwriting one in place doesn't. So outside of full scans,
+            # only replays we haven't seen need to be checked.
+            if not full and entry.name in self.seen:
+                continue
+            stat = entry.stat()
+            key = (stat.st_size, stat.st_mtime_ns)
+            if self.seen.get(entry.name) != key:
+                self.pending[entry.name] = (key, now)
+
+        removed = self.seen.keys() - names
+        for name in removed:
+            del self.seen[name]
+        return bool(removed)
+
+    def poll(self):
+        """
+        Checks the directory for new and changed replays.
+
+        Returns
+        -------
+        List[Path]
+            The paths of the replays which were added or changed, and have
+            finished being written, since the last call.
+        """
+        now = time.monotonic()
+        ready = []
+        for (name, (key, since)) in list(self.pending.items()):
+            try:
+                stat = os.stat(self.directory / name)
+            except FileNotFoundError:
+                del self.pending[name]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != key:
+                # still being written
+                self.pending[name] = (current, now)
+            elif now - since >= self.settle:
+                del self.pending[name]
+                self.delivered[name] = key
+                ready.append(self.directory / name)
+
+        # scan after checking pending replays, so that new replays are always
+        # seen twice before being returned
+        changed = False
+        full = self._needs_scan(now)
+        if full is not None:
+            changed = self._scan(now, full)
+
+        if changed:
+            self._save()
+        return sorted(ready)
+
+    def ack(self, path):
+        """
+        Marks a replay returned by :meth:`poll` as handled, so it is not
+        returned again (unless it changes), even by a new watcher.
+
+        Parameters
+        ----------
+        path: str or os.PathLike
+            The path of the replay, as returned by :meth:`poll`.
+        """
+        name = Path(path).name
+        key = self.delivered.pop(name, None)
+        if key is None:
+            return
+        self.seen[name] = key
+        self._save()
+
+    def nack(self, path):
+        """
+        Marks a replay returned by :meth:`poll` as not handled (eg because
+        handling it failed), so it is returned again by a later poll.
+
+        Parameters
+        ----------
+        path: str or os.PathLike
+            The path of the replay, as returned by :meth:`poll`.
+        """
+        # the next scan which checks the replay sees it as new again
+        self.delivered.pop(Path(path).name, None)
+
+    def _handle(self, path, error):
+        if error is None:
+            self.ack(path)
+            return
+        _log.error("Failed to handle %s", path, exc_info=error)
+        self.nack(path)
+
+    def run(self, callback, *, interval=1.0, executor=None, stop=None):
+        """
+        Polls the directory forever, and calls ``callback`` with the path of
+        each new or changed replay.
+
+        A replay is acknowledged (see :meth:`ack`) once ``callback`` returns.
+        If ``callback`` raises, the exception is logged to the
+        ``osrparse.watch`` logger, and the replay is returned again by a later
+        poll.
+
+        Parameters
+        ----------
+        callback: Callable[[Path], Any]
+            The function to call with each replay, eg
+            ``lambda path: handle(Replay.from_path(path))``.
+        interval: float
+            How long to wait between polls, in seconds.
+        executor: Optional[concurrent.futures.Executor]
+            If passed, ``callback`` is submitted to this executor instead of
+            called directly. ``callback`` must then be picklable if this is a
+            ``ProcessPoolExecutor``.
+        stop: Optional[threading.Event]
+            If passed, polling stops once this event is set. Callbacks which
+            were already submitted to ``executor`` are waited for.
+        """
+        # future -> path of callbacks submitted to `executor`
+        futures = {}
+
+        def collect(done):
+            # acknowledges finished callbacks. Only ever called from this
+            # thread, so the watcher's state is never modified concurrently.
+            for future in done:
+                self._handle(futures.pop(future), future.exception())
+
+        while stop is None or not stop.is_set():
+            collect([future for future in futures if future.done()])
+            for path in self.poll():
+                if executor is not None:
+                    futures[executor.submit(callback, path)] = path
+                    continue
+                try:
+                    callback(path)
+                except Exception as e:
+                    self._handle(path, e)
+                else:
+                    self._handle(path, None)
+            if stop is not None:
+                stop.wait(interval)
+            else:
+                time.sleep(interval)
+
+        collect(list(wait(futures).done))
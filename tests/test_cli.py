@@ -0,0 +1,70 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest import TestCase
+from tempfile import TemporaryDirectory
+
+from osrparse import Replay
+from osrparse.__main__ import main
+
+RES = Path(__file__).parent / "resources"
+
+
+def run(*argv):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    code = main(list(argv), stdout=stdout, stderr=stderr)
+    return (code, stdout.getvalue(), stderr.getvalue())
+
+
+class TestCli(TestCase):
+    def test_headers(self):
+        (code, out, _err) = run("headers", str(RES))
+        self.assertEqual(code, 0)
+        records = [json.loads(line) for line in out.splitlines()]
+        self.assertEqual(len(records), 6)
+        replay = Replay.from_path(RES / "ctb.osr")
+        self.assertEqual(records[0]["username"], replay.username)
+        self.assertEqual(records[0]["mods"], replay.mods.value)
+
+    def test_info_parallel(self):
+        (code, out, _err) = run("info", "-j", "2", "-f", "csv",
+            str(RES / "*.osr"))
+        self.assertEqual(code, 0)
+        lines = out.splitlines()
+        self.assertTrue(lines[0].startswith("path,mode,"))
+        self.assertEqual(len(lines), 7)
+        self.assertTrue(lines[3].endswith(",17500,"))
+
+    def test_frames(self):
+        (code, out, _err) = run("frames", str(RES / "replay.osr"))
+        self.assertEqual(code, 0)
+        frames = [json.loads(line) for line in out.splitlines()]
+        replay_data = Replay.from_path(RES / "replay.osr").replay_data
+        self.assertEqual(len(frames), len(replay_data))
+        self.assertEqual(frames[2]["x"], replay_data[2].x)
+
+    def test_repack(self):
+        with TemporaryDirectory() as tempdir:
+            (code, _out, _err) = run("repack", "-o", tempdir,
+                str(RES / "replay.osr"))
+            self.assertEqual(code, 0)
+            replay = Replay.from_path(Path(tempdir) / "replay.osr")
+        self.assertEqual(replay, Replay.from_path(RES / "replay.osr"))
+
+    def test_error(self):
+        with TemporaryDirectory() as tempdir:
+            bad = Path(tempdir) / "bad.osr"
+            bad.write_bytes(b"\x00\x01")
+            (code, out, err) = run("convert", str(bad), str(RES / "ctb.osr"))
+        self.assertEqual(code, 1)
+        self.assertIn("bad.osr", err)
+        self.assertEqual(len(out.splitlines()), 1)
+
+    def test_lazy_imports(self):
+        code = ("import sys, osrparse; "
+            "print(sorted({'lzma', 'base64'} & set(sys.modules)))")
+        out = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(out.strip(), b"[]")
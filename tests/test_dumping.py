@@ -1,8 +1,13 @@
+import io
+import json
+import pickle
+from dataclasses import replace, fields, asdict, astuple
 from pathlib import Path
 from unittest import TestCase
 from tempfile import TemporaryDirectory
 
-from osrparse import Replay
+from osrparse import Replay, Mod, FrameColumns
+from osrparse.replay import _Unpacker
 
 
 RES = Path(__file__).parent / "resources"
@@ -30,3 +35,128 @@ class TestDumping(TestCase):
         for attr in attrs:
             self.assertEqual(getattr(self.replay, attr), getattr(r2, attr),
                 f"{attr} is wrong")
+
+    def test_fixed_fields(self):
+        # count_300 through mods are packed in a single call, so make sure
+        # none of them are out of place
+        replay = replace(self.replay, count_300=1, count_100=2, count_50=3,
+            count_geki=4, count_katu=5, count_miss=6, score=7, max_combo=8,
+            perfect=True, mods=Mod.Hidden | Mod.Flashlight)
+        self.assertEqual(Replay.from_string(replay.pack()), replay)
+
+
+class TestJson(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.replays = [Replay.from_path(RES / name) for name in
+            ["replay.osr", "taiko.osr", "ctb.osr", "mania.osr"]]
+
+    def test_round_trip(self):
+        for replay in self.replays:
+            for frames in ["columnar", "rows"]:
+                data = json.loads(replay.to_json(frames=frames))
+                self.assertEqual(Replay.from_dict(data), replay,
+                    f"{replay.mode} with {frames} frames is wrong")
+
+    def test_columnar(self):
+        data = self.replays[0].to_dict()
+        replay = Replay.from_dict(data)
+        self.assertIsInstance(replay.replay_data, list)
+        replay.replay_data[5].x += 1
+        self.assertNotEqual(replay, self.replays[0])
+
+        replay = Replay.from_dict(data, columnar=True)
+        self.assertIsInstance(replay.replay_data, FrameColumns)
+        self.assertEqual(replay, self.replays[0])
+
+    def test_values(self):
+        data = self.replays[0].to_dict()
+        self.assertEqual(data["mods"], 0)
+        self.assertEqual(data["timestamp"], "2013-02-01T16:31:34+00:00")
+        self.assertEqual(list(data["replay_data"]),
+            ["time_delta", "x", "y", "keys"])
+        self.assertEqual(len(data["replay_data"]["x"]), 17500)
+        self.assertNotIn("replay_data", self.replays[0].to_dict(frames=None))
+
+    def test_write_json(self):
+        for replay in self.replays:
+            for frames in ["columnar", "rows", None]:
+                f = io.StringIO()
+                replay.write_json(f, frames=frames)
+                self.assertEqual(json.loads(f.getvalue()),
+                    replay.to_dict(frames=frames))
+
+    def test_without_replay_data(self):
+        for replay in self.replays:
+            header = Replay.from_dict(replay.to_dict(frames=None))
+            self.assertIsNone(header.replay_data)
+            for frames in ["columnar", "rows"]:
+                data = header.to_dict(frames=frames)
+                self.assertIsNone(data["replay_data"])
+                self.assertEqual(Replay.from_dict(data), header)
+
+                f = io.StringIO()
+                header.write_json(f, frames=frames)
+                self.assertEqual(json.loads(f.getvalue()), data)
+
+
+class TestPassThrough(TestCase):
+    def test_header_edit(self):
+        data = (RES / "replay.osr").read_bytes()
+        replay = Replay.from_string(data)
+        replay.username = "fake username"
+        packed = replay.pack()
+        # everything after the username is copied verbatim
+        self.assertEqual(packed[-100:], data[-100:])
+        self.assertEqual(len(packed), len(data) - len("Cookiezi") +
+            len("fake username"))
+
+    def test_unmodified(self):
+        for name in ["replay.osr", "taiko.osr", "ctb.osr"]:
+            data = (RES / name).read_bytes()
+            self.assertEqual(Replay.from_string(data).pack(), data)
+
+    def test_modified(self):
+        replay = Replay.from_path(RES / "replay.osr")
+        replay.replay_data[5].x += 1
+        r2 = Replay.from_string(replay.pack())
+        self.assertEqual(r2.replay_data, replay.replay_data)
+
+        replay = Replay.from_path(RES / "mania.osr")
+        replay.life_bar_graph[0].life = 0.5
+        r2 = Replay.from_string(replay.pack())
+        self.assertEqual(r2.life_bar_graph, replay.life_bar_graph)
+
+        replay.rng_seed = 123
+        self.assertEqual(Replay.from_string(replay.pack()).rng_seed, 123)
+
+    def test_modified_columns(self):
+        data = (RES / "replay.osr").read_bytes()
+        replay = _Unpacker(data, columnar=True).unpack()
+        replay.replay_data.x[5] += 1
+        r2 = Replay.from_string(replay.pack())
+        self.assertEqual(r2.replay_data, replay.replay_data)
+
+    def test_pickle(self):
+        data = (RES / "replay.osr").read_bytes()
+        replay = Replay.from_string(data)
+        pickled = pickle.dumps(replay)
+        # the original play data isn't pickled
+        self.assertLess(len(pickled),
+            len(pickle.dumps(replay.replay_data)) + 1000)
+        r2 = pickle.loads(pickled)
+        self.assertEqual(r2, replay)
+        self.assertFalse(hasattr(r2, "_original"))
+        self.assertEqual(Replay.from_string(r2.pack()), replay)
+
+    def test_dataclass_fields(self):
+        # the original play data isn't part of the dataclass
+        replay = Replay.from_path(RES / "replay.osr")
+        self.assertEqual(len(fields(replay)), 20)
+        self.assertEqual(len(astuple(replay)), 20)
+        self.assertNotIn("_original", asdict(replay))
+
+    def test_compression_settings(self):
+        data = (RES / "replay.osr").read_bytes()
+        packed = Replay.from_string(data).pack(dict_size=1 << 16)
+        self.assertNotEqual(packed, data)
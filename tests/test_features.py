@@ -0,0 +1,49 @@
+from pathlib import Path
+from unittest import TestCase
+
+from osrparse import Replay, ReplayEventOsu, Key
+from osrparse.features import kinematics, kinematics_many
+
+RES = Path(__file__).parent / "resources"
+
+
+class TestKinematics(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.replay = Replay.from_path(RES / "replay.osr")
+
+    def test_lengths(self):
+        k = kinematics(self.replay)
+        n = len(k.time)
+        self.assertEqual(len(k.frame_time), n - 1)
+        self.assertEqual(len(k.velocity), n - 1)
+        self.assertEqual(len(k.acceleration), n - 2)
+        self.assertEqual(len(k.jerk), n - 3)
+        self.assertEqual(len(k.angle), n - 2)
+        self.assertEqual(k.summary["frames"] + k.summary["skipped"],
+            len(self.replay.replay_data))
+        self.assertTrue(all(t > 0 for t in k.frame_time))
+
+    def test_skipped_frames(self):
+        events = [(0, 0, 0), (-1, 0, 0), (10, 0, 0), (0, 5, 0), (10, 10, 0),
+            (-30, 50, 50), (10, 50, 50), (25, 20, 0)]
+        replay = Replay.from_path(RES / "replay.osr")
+        replay.replay_data = [ReplayEventOsu(t, x, y, Key(0)) for
+            (t, x, y) in events]
+        k = kinematics(replay)
+        # the zero and negative deltas are skipped, as is the frame at time
+        # -1, which goes back past a previously used frame.
+        self.assertEqual(list(k.time), [9, 19, 24])
+        self.assertEqual(list(k.velocity), [1.0, 2.0])
+        self.assertEqual(k.summary["skipped"], 5)
+
+    def test_kinematics_many(self):
+        paths = [RES / "replay.osr", RES / "replay2.osr"]
+        serial = list(kinematics_many(paths))
+        parallel = list(kinematics_many(paths, workers=2))
+        self.assertEqual(serial, parallel)
+        self.assertEqual(serial[0], kinematics(self.replay))
+
+    def test_wrong_mode(self):
+        with self.assertRaises(ValueError):
+            kinematics(Replay.from_path(RES / "taiko.osr"))
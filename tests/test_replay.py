@@ -1,8 +1,14 @@
 from pathlib import Path
 from unittest import TestCase
 from datetime import datetime, timezone
+import base64
+import lzma
+import typing
 from osrparse import (ReplayEventOsu, GameMode, Mod, ReplayEventTaiko,
-    ReplayEventCatch, ReplayEventMania, Replay)
+    ReplayEventCatch, ReplayEventMania, Replay, FrameColumns,
+    parse_replay_data, parse_replay_data_many, DecodeLimits,
+    LimitExceededError)
+from osrparse.replay import _Packer, _Unpacker
 
 RES = Path(__file__).parent / "resources"
 
@@ -62,6 +68,10 @@ class TestStandardReplay(TestCase):
         for replay in self._replays:
             self.assertEqual(replay.timestamp, datetime(2013, 2, 1, 16, 31, 34, tzinfo=timezone.utc), "Timestamp is wrong")
 
+    def test_type_hints(self):
+        hints = typing.get_type_hints(Replay)
+        self.assertIs(hints["timestamp"], datetime)
+
     def test_play_data(self):
         for replay in self._replays:
             self.assertIsInstance(replay.replay_data[0], ReplayEventOsu, "Replay data is wrong")
@@ -106,3 +116,76 @@ class TestManiaReplay(TestCase):
         play_data = self.replay.replay_data
         self.assertIsInstance(play_data[0], ReplayEventMania, "Replay data is wrong")
         self.assertEqual(len(play_data), 17432, "Replay data is wrong")
+
+class TestParseReplayDataMany(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replays = [Replay.from_path(RES / name) for name in
+            ["replay.osr", "replay2.osr"]]
+        # the compressed replay data of a replay, as returned by api v1
+        cls.payloads = [base64.b64encode(_Packer(r).pack_replay_data()[4:])
+            for r in cls.replays]
+
+    def test_columnar(self):
+        results = list(parse_replay_data_many(iter(self.payloads * 3)))
+        self.assertEqual(len(results), 6)
+        for replay, replay_data in zip(self.replays * 3, results):
+            self.assertIsInstance(replay_data, FrameColumns)
+            self.assertEqual(replay_data, replay.replay_data)
+
+    def test_events(self):
+        results = list(parse_replay_data_many(self.payloads, columnar=False,
+            workers=2))
+        for replay, replay_data in zip(self.replays, results):
+            self.assertIsInstance(replay_data, list)
+            self.assertEqual(replay_data, replay.replay_data)
+        self.assertEqual(results[0], parse_replay_data(self.payloads[0]))
+
+class TestDecodeLimits(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = (RES / "replay.osr").read_bytes()
+
+    def test_within_limits(self):
+        limits = DecodeLimits(max_compressed_size=1 << 20,
+            max_decompressed_size=1 << 20, max_frames=17500,
+            max_string_length=32)
+        replay = Replay.from_string(self.data, limits=limits)
+        self.assertEqual(replay, Replay.from_string(self.data))
+
+    def test_exceeded(self):
+        for limits in [DecodeLimits(max_compressed_size=1000),
+            DecodeLimits(max_decompressed_size=1000),
+            DecodeLimits(max_frames=17499),
+            DecodeLimits(max_string_length=7)]:
+            with self.assertRaises(LimitExceededError, msg=str(limits)):
+                Replay.from_string(self.data, limits=limits)
+
+    def test_decompression_bomb(self):
+        bomb = lzma.compress(b"0" * (1 << 26), format=lzma.FORMAT_ALONE)
+        self.assertLess(len(bomb), 1 << 14)
+        limits = DecodeLimits(max_decompressed_size=1 << 20)
+        with self.assertRaises(LimitExceededError):
+            parse_replay_data(bomb, decoded=True, limits=limits)
+
+    def test_dictionary_size(self):
+        # a crafted header declaring a 3 GiB dictionary, which the decoder
+        # would allocate up front
+        unpacker = _Unpacker(self.data)
+        unpacker.unpack_fields()
+        length = unpacker.unpack_once("i")
+        compressed = bytearray(
+            self.data[unpacker.offset:unpacker.offset + length])
+        compressed[1:5] = (0xC0000000).to_bytes(4, "little")
+        for limits in [DecodeLimits(max_decompressed_size=1 << 20),
+            DecodeLimits(max_memory=1 << 24)]:
+            with self.assertRaises(LimitExceededError, msg=str(limits)):
+                parse_replay_data(bytes(compressed), decoded=True,
+                    limits=limits)
+
+    def test_memory_within_limits(self):
+        limits = DecodeLimits(max_memory=1 << 24)
+        replay = Replay.from_string(self.data, limits=limits)
+        self.assertEqual(replay, Replay.from_string(self.data))
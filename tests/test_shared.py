@@ -0,0 +1,81 @@
+import gc
+import copy
+import sys
+import pickle
+import subprocess
+from pathlib import Path
+from unittest import TestCase
+from multiprocessing import shared_memory
+
+from osrparse import Replay
+from osrparse.shared import SharedReplay, parse_shared
+
+RES = Path(__file__).parent / "resources"
+ROOT = Path(__file__).parent.parent
+
+
+class TestSharedReplay(TestCase):
+    def test_attach(self):
+        for name in ["replay.osr", "taiko.osr", "ctb.osr", "mania.osr"]:
+            replay = Replay.from_path(RES / name)
+            shared = SharedReplay.from_path(RES / name).attach()
+            self.assertEqual(shared, replay, f"{name} is wrong")
+
+    def test_process_pool(self):
+        # run in a fresh interpreter, so that no resource tracker is already
+        # running in this process for the workers to inherit. Handles are
+        # attached after the pool has shut down.
+        code = f"""
+from concurrent.futures import ProcessPoolExecutor
+from osrparse import Replay
+from osrparse.shared import parse_shared
+
+paths = [{str(RES / "replay.osr")!r}, {str(RES / "replay2.osr")!r}]
+if __name__ == "__main__":
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        handles = list(executor.map(parse_shared, paths))
+    for handle, path in zip(handles, paths):
+        replay = handle.attach()
+        assert replay.replay_data == Replay.from_path(path).replay_data
+    print("ok")
+"""
+        result = subprocess.run([sys.executable, "-c", code],
+            capture_output=True, text=True, cwd=ROOT)
+        self.assertEqual(result.stdout.strip(), "ok", result.stderr)
+        # no leaked or already unlinked blocks are reported at shutdown
+        self.assertEqual(result.stderr, "")
+
+    def test_freed(self):
+        handle = SharedReplay.from_path(RES / "replay.osr")
+        replay = handle.attach()
+        del replay
+        gc.collect()
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle.name)
+
+    def test_freed_with_slice(self):
+        handle = SharedReplay.from_path(RES / "replay.osr")
+        replay = handle.attach()
+        x = replay.replay_data.x[0:10]
+        # errors in finalizers are only reported to `sys.unraisablehook`
+        errors = []
+        hook = sys.unraisablehook
+        sys.unraisablehook = errors.append
+        try:
+            del replay
+            gc.collect()
+            # the slice is still usable after the replay is freed
+            self.assertEqual(len(x), 10)
+            del x
+            gc.collect()
+        finally:
+            sys.unraisablehook = hook
+        self.assertEqual(errors, [])
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handle.name)
+
+    def test_pickle(self):
+        replay = SharedReplay.from_path(RES / "replay.osr").attach()
+        expected = Replay.from_path(RES / "replay.osr")
+        self.assertEqual(pickle.loads(pickle.dumps(replay)), expected)
+        self.assertEqual(copy.deepcopy(replay), expected)
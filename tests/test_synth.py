@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from osrparse import Replay, GameMode, FrameColumns
+from osrparse.synth import generate, generate_bytes
+
+
+class TestSynth(TestCase):
+
+    def test_deterministic(self):
+        for mode in GameMode:
+            self.assertEqual(generate(mode, seed=1), generate(mode, seed=1))
+            self.assertEqual(generate_bytes(mode, seed=1),
+                generate_bytes(mode, seed=1))
+        self.assertNotEqual(generate(GameMode.STD, seed=1),
+            generate(GameMode.STD, seed=2))
+
+    def test_round_trip(self):
+        for mode in GameMode:
+            for old_replay_id in [False, True]:
+                with self.subTest(mode=mode, old_replay_id=old_replay_id):
+                    replay = generate(mode, frames=2000, seed=3)
+                    data = generate_bytes(mode, frames=2000, seed=3,
+                        old_replay_id=old_replay_id)
+                    self.assertEqual(Replay.from_string(data), replay)
+
+    def test_frames(self):
+        replay = generate(GameMode.STD, frames=500)
+        self.assertEqual(len(replay.replay_data), 500)
+        self.assertEqual(replay.replay_data[0].time_delta, 0)
+        self.assertEqual(replay.replay_data[1].time_delta, -1)
+        self.assertIsNotNone(replay.rng_seed)
+        self.assertIsNone(generate(GameMode.STD, rng_seed=False).rng_seed)
+
+    def test_mania_keys(self):
+        replay = generate(GameMode.MANIA, frames=2000)
+        keys = [event.keys for event in replay.replay_data]
+        self.assertLess(max(keys), 1 << 18)
+        self.assertGreaterEqual(max(keys), 1 << 17)
+
+    def test_life_bar(self):
+        data = generate_bytes(GameMode.STD, frames=10, life_bar=5000)
+        replay = Replay.from_string(data)
+        self.assertEqual(len(replay.life_bar_graph), 5000)
+
+    def test_columnar(self):
+        replay = generate(GameMode.CTB, frames=100)
+        self.assertIsInstance(replay.replay_data, list)
+        columnar = generate(GameMode.CTB, frames=100, columnar=True)
+        self.assertIsInstance(columnar.replay_data, FrameColumns)
+        self.assertEqual(columnar, replay)
@@ -0,0 +1,81 @@
+from pathlib import Path
+from unittest import TestCase
+from tempfile import TemporaryDirectory
+
+from osrparse import Replay, Mod, HeaderTable, GameMode
+from osrparse.synth import generate
+
+RES = Path(__file__).parent / "resources"
+
+
+class TestHeaderTable(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.paths = sorted(RES.glob("*.osr"))
+        cls.table = HeaderTable.from_paths(cls.paths)
+
+    def test_columns(self):
+        self.assertEqual(len(self.table), len(self.paths))
+        for i, path in enumerate(self.paths):
+            replay = Replay.from_path(path)
+            row = self.table.row(i)
+            for attr in ["game_version", "beatmap_hash", "username",
+                "replay_hash", "count_300", "count_miss", "score",
+                "max_combo", "perfect", "replay_id"]:
+                self.assertEqual(row[attr], getattr(replay, attr),
+                    f"{attr} of {path.name} is wrong")
+            self.assertEqual(row["mode"], replay.mode.value)
+            self.assertEqual(row["mods"], replay.mods.value)
+
+    def test_workers(self):
+        table = HeaderTable.from_paths(self.paths, workers=2)
+        self.assertEqual(table.row(3), self.table.row(3))
+
+    def test_from_strings(self):
+        datas = [path.read_bytes() for path in self.paths]
+        table = HeaderTable.from_strings(datas)
+        self.assertEqual(len(table), len(self.paths))
+        for i in range(len(self.paths)):
+            row = table.row(i)
+            self.assertIsNone(row.pop("path"))
+            expected = self.table.row(i)
+            del expected["path"]
+            self.assertEqual(row, expected)
+
+    def test_long_life_bar(self):
+        # the header doesn't fit in the first read of the file
+        replay = generate(GameMode.STD, frames=100, life_bar=5000)
+        with TemporaryDirectory() as tempdir:
+            path = Path(tempdir) / "replay.osr"
+            replay.write_path(path)
+            table = HeaderTable.from_paths([path])
+        row = table.row(0)
+        for attr in ["username", "score", "max_combo", "replay_id"]:
+            self.assertEqual(row[attr], getattr(replay, attr))
+
+    def test_interned(self):
+        # replay, replay2 and replay_old_replayid share a username, and the
+        # latter two share a beatmap
+        self.assertEqual(len(self.table.username.values), 4)
+        groups = self.table.group_by_beatmap()
+        self.assertEqual(len(groups), 5)
+        self.assertEqual(list(groups["e0d805c891bf0e18ecb543435c6625f7"]),
+            [3, 4])
+
+    def test_mods(self):
+        rows = self.table.mods_all(Mod.Hidden | Mod.HardRock)
+        selected = self.table.select(rows)
+        self.assertEqual(selected.path, [str(RES / name) for name in
+            ["ctb.osr", "replay2.osr", "replay_old_replayid.osr"]])
+        self.assertEqual(len(self.table.mods_none(Mod.HardRock)), 3)
+        self.assertEqual(len(self.table.mods_any(Mod.DoubleTime |
+            Mod.HardRock)), 4)
+
+    def test_select_iterator(self):
+        selected = self.table.select(i for i in [0, 2])
+        self.assertEqual(len(selected), 2)
+        self.assertEqual(selected.row(1), self.table.row(2))
+
+    def test_load(self):
+        replays = list(self.table.load([1]))
+        self.assertEqual(replays, [Replay.from_path(self.paths[1])])
@@ -0,0 +1,89 @@
+from pathlib import Path
+from unittest import TestCase
+from tempfile import TemporaryDirectory
+
+from osrparse import Replay, Mod, FrameColumns
+from osrparse.transforms import (Transform, compose, mirror_x, flip_y, shift,
+    trim, speed, write_variants)
+
+RES = Path(__file__).parent / "resources"
+
+
+def times(replay):
+    t = 0
+    result = []
+    for event in replay.replay_data:
+        t += event.time_delta
+        result.append(t)
+    return result
+
+
+class TestTransforms(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.replay = Replay.from_path(RES / "replay.osr")
+
+    def test_identity(self):
+        self.assertEqual(Transform()(self.replay), self.replay)
+
+    def test_columnar(self):
+        transformed = shift(10)(self.replay)
+        self.assertIsInstance(transformed.replay_data, list)
+        transformed.replay_data[5].x += 1
+        self.assertEqual(transformed.replay_data[5].x,
+            self.replay.replay_data[5].x + 1)
+
+        columnar = shift(10)(self.replay, columnar=True)
+        self.assertIsInstance(columnar.replay_data, FrameColumns)
+        self.assertEqual(columnar, shift(10)(self.replay))
+
+    def test_positions(self):
+        transformed = compose(mirror_x(), flip_y())(self.replay)
+        for (a, b) in zip(self.replay.replay_data, transformed.replay_data):
+            self.assertEqual(b.x, 512 - a.x)
+            self.assertEqual(b.y, 384 - a.y)
+            self.assertEqual(b.keys, a.keys)
+        # flipping twice is a no-op
+        self.assertEqual(compose(flip_y(), flip_y())(self.replay),
+            self.replay)
+
+    def test_trim_and_shift(self):
+        transformed = compose(shift(1000), trim(11_000, 21_000))(self.replay)
+        original = [t + 1000 for t in times(self.replay)]
+        expected = [t for t in original if 11_000 <= t < 21_000]
+        self.assertEqual(times(transformed), expected)
+
+    def test_life_bar(self):
+        replay = Replay.from_path(RES / "mania.osr")
+        transform = compose(shift(1000), trim(11_000, 41_000), speed(1.5))
+        transformed = transform(replay)
+        expected = [(round((s.time + 1000) / 1.5), s.life) for s in
+            replay.life_bar_graph if 11_000 <= s.time + 1000 < 41_000]
+        self.assertTrue(expected)
+        self.assertEqual([(s.time, s.life) for s in
+            transformed.life_bar_graph], expected)
+
+    def test_speed(self):
+        transformed = speed(1.5)(self.replay)
+        self.assertEqual(transformed.mods, Mod.DoubleTime)
+        self.assertEqual(times(transformed),
+            [round(t / 1.5) for t in times(self.replay)])
+
+        hidden_hardrock = Replay.from_path(RES / "replay2.osr")
+        self.assertEqual(speed(0.75)(hidden_hardrock).mods,
+            Mod.Hidden | Mod.HardRock | Mod.HalfTime)
+        taiko = Replay.from_path(RES / "taiko.osr")
+        self.assertEqual(taiko.mods & Mod.Nightcore, Mod.Nightcore)
+        self.assertEqual(speed(1 / 1.5)(taiko).mods, Mod.Hidden)
+        with self.assertRaises(ValueError):
+            speed(2)(taiko)
+
+    def test_write_variants(self):
+        variants = {"hr": flip_y(), "dt": speed(1.5)}
+        with TemporaryDirectory() as tempdir:
+            outputs = list(write_variants([RES / "replay.osr"], variants,
+                tempdir))
+            self.assertEqual([p.name for p in outputs[0]],
+                ["replay.hr.osr", "replay.dt.osr"])
+            replay = Replay.from_path(outputs[0][1])
+        self.assertEqual(replay, variants["dt"](self.replay))
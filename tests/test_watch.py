@@ -0,0 +1,181 @@
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+from tempfile import TemporaryDirectory
+
+from osrparse import Replay
+from osrparse.watch import ReplayWatcher
+
+RES = Path(__file__).parent / "resources"
+
+
+class TestReplayWatcher(TestCase):
+    def setUp(self):
+        self._tempdir = TemporaryDirectory()
+        self.tempdir = Path(self._tempdir.name)
+        self.replays = self.tempdir / "Replays"
+        self.replays.mkdir()
+        self.state_path = self.tempdir / "state.json"
+
+    def tearDown(self):
+        self._tempdir.cleanup()
+
+    def watcher(self):
+        return ReplayWatcher(self.replays, state_path=self.state_path,
+            settle=0)
+
+    def test_new_files(self):
+        watcher = self.watcher()
+        self.assertEqual(watcher.poll(), [])
+        shutil.copy(RES / "replay.osr", self.replays)
+        (self.replays / "notes.txt").write_text("not a replay")
+        # a new file is only returned once it has stopped changing
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [self.replays / "replay.osr"])
+        self.assertEqual(watcher.poll(), [])
+
+    def test_partially_written(self):
+        watcher = self.watcher()
+        data = (RES / "replay.osr").read_bytes()
+        path = self.replays / "replay.osr"
+        path.write_bytes(data[:1000])
+        watcher.poll()
+        with open(path, "ab") as f:
+            f.write(data[1000:])
+        self.assertEqual(watcher.poll(), [])
+        self.assertEqual(watcher.poll(), [path])
+        Replay.from_path(path)
+
+    def test_state(self):
+        watcher = self.watcher()
+        shutil.copy(RES / "replay.osr", self.replays)
+        watcher.poll()
+        watcher.ack(*watcher.poll())
+
+        # a new watcher doesn't return replays which were already handled
+        watcher = self.watcher()
+        shutil.copy(RES / "ctb.osr", self.replays)
+        watcher.poll()
+        self.assertEqual(watcher.poll(), [self.replays / "ctb.osr"])
+        watcher.ack(self.replays / "ctb.osr")
+
+        # but does return replays which changed
+        watcher = self.watcher()
+        path = self.replays / "replay.osr"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        watcher.poll()
+        self.assertEqual(watcher.poll(), [path])
+
+    def test_unacknowledged(self):
+        watcher = self.watcher()
+        shutil.copy(RES / "replay.osr", self.replays)
+        watcher.poll()
+        self.assertEqual(watcher.poll(), [self.replays / "replay.osr"])
+        # a returned replay isn't returned again by the same watcher
+        self.assertEqual(watcher.poll(), [])
+
+        # but is by a new watcher if it was never acknowledged, eg because
+        # the process died while handling it
+        watcher = self.watcher()
+        watcher.poll()
+        self.assertEqual(watcher.poll(), [self.replays / "replay.osr"])
+
+    def test_stats_only_new_files(self):
+        for i in range(300):
+            (self.replays / f"{i}.osr").write_bytes(b"")
+        watcher = self.watcher()
+        watcher.poll()
+        watcher.poll()
+
+        stats = []
+        scandir = os.scandir
+
+        class Entry:
+            def __init__(self, entry):
+                self.entry = entry
+                self.name = entry.name
+
+            def is_file(self):
+                return self.entry.is_file()
+
+            def stat(self):
+                stats.append(self.name)
+                return self.entry.stat()
+
+        def counting_scandir(path):
+            return map(Entry, scandir(path))
+
+        shutil.copy(RES / "replay.osr", self.replays)
+        with patch("osrparse.watch.os.scandir", counting_scandir):
+            watcher.poll()
+            self.assertEqual(watcher.poll(), [self.replays / "replay.osr"])
+        self.assertEqual(stats, ["replay.osr"])
+
+    def test_rescan_interval(self):
+        path = self.replays / "replay.osr"
+        shutil.copy(RES / "replay.osr", path)
+        watcher = ReplayWatcher(self.replays, settle=0, rescan_interval=0)
+        watcher.poll()
+        watcher.ack(*watcher.poll())
+
+        # overwriting a replay in place is only noticed by a full scan
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        watcher.poll()
+        self.assertEqual(watcher.poll(), [path])
+
+    def test_run(self):
+        shutil.copy(RES / "replay.osr", self.replays)
+        stop = threading.Event()
+        parsed = []
+
+        def callback(path):
+            parsed.append(Replay.from_path(path))
+            stop.set()
+
+        self.watcher().run(callback, interval=0.01, stop=stop)
+        self.assertEqual(parsed, [Replay.from_path(RES / "replay.osr")])
+
+    def test_run_failure(self):
+        shutil.copy(RES / "replay.osr", self.replays)
+        stop = threading.Event()
+        calls = []
+
+        def callback(path):
+            calls.append(path)
+            if len(calls) == 1:
+                raise ValueError("failed to handle replay")
+            stop.set()
+
+        watcher = ReplayWatcher(self.replays, state_path=self.state_path,
+            settle=0, rescan_interval=0)
+        with self.assertLogs("osrparse.watch") as logs:
+            watcher.run(callback, interval=0.01, stop=stop)
+        self.assertIn("failed to handle replay", logs.output[0])
+        # the replay was returned again after failing
+        self.assertEqual(calls, [self.replays / "replay.osr"] * 2)
+        self.assertIn("replay.osr", watcher.seen)
+
+    def test_run_executor(self):
+        shutil.copy(RES / "replay.osr", self.replays)
+        shutil.copy(RES / "ctb.osr", self.replays)
+        stop = threading.Event()
+
+        def callback(path):
+            stop.set()
+            if path.name == "ctb.osr":
+                raise ValueError("failed to handle replay")
+
+        watcher = self.watcher()
+        with ThreadPoolExecutor() as executor:
+            with self.assertLogs("osrparse.watch") as logs:
+                watcher.run(callback, interval=0.01, executor=executor,
+                    stop=stop)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("ctb.osr", logs.output[0])
+        self.assertEqual(list(watcher.seen), ["replay.osr"])